@@ -2,46 +2,54 @@ import streamlit as st
 import datetime
 import streamlit.components.v1 as components
 from src.database import DreamShiftDB
-from src.ui import load_global_css, render_custom_sidebar
+from src.ui import load_global_css, render_custom_sidebar, get_cached_workspaces
+from src.async_db import load_bundle
+from components.icons import get_icon_registry
 
 # Page Config
 st.set_page_config(page_title="Home", page_icon="static/icons/home.svg", layout="wide")
 load_global_css()
-render_custom_sidebar()
 
 db = DreamShiftDB()
 
 # Auth Check
 if "user_email" not in st.session_state: 
     st.switch_page("pages/sign-in.py")
+user_email = st.session_state.user_email
+
+# --- PAGE DATA ---
+# Independent reads go out together, so the page waits for the slowest one rather than the sum
+data = load_bundle(
+    stats=lambda: db.get_user_stats(user_email),
+    hours=lambda: db.get_user_time_total(user_email),
+    my_tasks=lambda: db.get_tasks_with_urgency({"assignee": user_email, "status": {"$ne": "Completed"}}),
+    notifs=lambda: db.get_unread_notifications(user_email),
+)
+# The workspace list is session-cached (it reads session state, so it stays on the script thread)
+render_custom_sidebar(workspaces=get_cached_workspaces(db))
 
 # --- LOGIC: DEADLINE CHECKER (Inbox Only - No Email) ---
 if "deadline_checked" not in st.session_state:
     try:
-        tasks = db.get_tasks_with_urgency({
-            "assignee": st.session_state.user_email, 
-            "status": {"$ne": "Completed"}
-        })
-        for t in tasks:
+        # Unread alerts are already in the bundle, so no lookup per task
+        alerted = {n.get('link') for n in data["notifs"] if n.get('title') == "Deadline Alert"}
+        created = False
+        for t in data["my_tasks"]:
             # If task is Overdue (Red) or Urgent (Orange)
             if t.get('urgency_color') in ["#d32f2f", "#f57c00"]:
-                # Check for existing unread notification to avoid spam
-                existing = db.db.notifications.find_one({
-                    "user_email": st.session_state.user_email,
-                    "title": "Deadline Alert",
-                    "link": f"task:{t['_id']}",
-                    "read": False
-                })
-                
-                if not existing:
+                # Skip tasks that already have an unread alert to avoid spam
+                if f"task:{t['_id']}" not in alerted:
                     # Create Inbox Notification (No Email)
                     db.create_notification(
-                        st.session_state.user_email, 
+                        user_email, 
                         "Deadline Alert", 
                         f"Task '{t['title']}' is due soon ({t.get('due_date').strftime('%Y-%m-%d')}).", 
                         "warning",
                         link=f"task:{t['_id']}"
                     )
+                    created = True
+        if created:
+            data["notifs"] = db.get_unread_notifications(user_email)
         st.session_state['deadline_checked'] = True
     except Exception as e:
         print(f"Deadline check skipped: {e}")
@@ -52,12 +60,12 @@ if "deadline_checked" not in st.session_state:
 
 user_name = st.session_state.get('user_name', 'User')
 
-# Define SVGs inline to ensure they work without file dependencies
-svg_morning = """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="#f6b900" width="48" height="48"><path d="M12 7c-2.76 0-5 2.24-5 5s2.24 5 5 5 5-2.24 5-5-2.24-5-5-5zm0 9c-2.21 0-4-1.79-4-4s1.79-4 4-4 4 1.79 4 4-1.79 4-4 4zM2 13h2c.55 0 1-.45 1-1s-.45-1-1-1H2c-.55 0-1 .45-1 1s.45 1 1 1zm18 0h2c.55 0 1-.45 1-1s-.45-1-1-1h-2c-.55 0-1 .45-1 1s.45 1 1 1zM11 2v2c0 .55.45 1 1 1s1-.45 1-1V2c0-.55-.45-1-1-1s-1 .45-1 1zm0 18v2c0 .55.45 1 1 1s1-.45 1-1v-2c0-.55-.45-1-1-1s-1 .45-1 1zM5.99 4.58c-.39-.39-1.03-.39-1.41 0-.39.39-.39 1.03 0 1.41l1.06 1.06c.39.39 1.03.39 1.41 0s.39-1.03 0-1.41L5.99 4.58zm12.37 12.37c-.39-.39-1.03-.39-1.41 0-.39.39-.39 1.03 0 1.41l1.06 1.06c.39.39 1.03.39 1.41 0 .39-.39.39-1.03 0-1.41l-1.06-1.06zm1.06-10.96c.39-.39.39-1.03 0-1.41-.39-.39-1.03-.39-1.41 0l-1.06 1.06c-.39.39-.39 1.03 0 1.41s1.03.39 1.41 0l1.06-1.06zM7.05 18.36c.39-.39.39-1.03 0-1.41-.39-.39-1.03-.39-1.41 0l-1.06 1.06c-.39.39-.39 1.03 0 1.41s1.03.39 1.41 0l1.06-1.06z"/></svg>"""
-
-svg_evening = """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="#f6b900" width="48" height="48"><path d="M20 8.69V4h-4.69L12 .69 8.69 4H4v4.69L.69 12 4 15.31V20h4.69L12 23.31 15.31 20H20v-4.69L23.31 12 20 8.69zM12 18c-3.31 0-6-2.69-6-6s2.69-6 6-6 6 2.69 6 6-2.69 6-6 6zm0-10c-2.21 0-4 1.79-4 4s1.79 4 4 4 4-1.79 4-4-1.79-4-4-4z"/></svg>"""
-
-svg_night = """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="#f6b900" width="48" height="48"><path d="M12 3c-4.97 0-9 4.03-9 9s4.03 9 9 9 9-4.03 9-9c0-.46-.04-.92-.1-1.36-.98 1.37-2.58 2.26-4.4 2.26-3.03 0-5.5-2.47-5.5-5.5 0-1.82.89-3.42 2.26-4.4-.44-.06-.9-.1-1.36-.1z"/></svg>"""
+# Greeting icons come from the icon registry (loaded and minified once per process).
+# The greeting renders in its own iframe, so it cannot reference the page's sprite.
+icons = get_icon_registry()
+svg_morning = icons.svg("morning")
+svg_evening = icons.svg("afternoon")
+svg_night = icons.svg("night")
 
 # JavaScript to detect time and inject correct SVG/Text
 greeting_html = f"""
@@ -113,7 +121,7 @@ greeting_html = f"""
 components.html(greeting_html, height=100)
 
 # --- METRICS ---
-stats = db.get_user_stats(st.session_state.user_email)
+stats = data["stats"]
 col1, col2, col3 = st.columns(3)
 
 # Custom metric styling
@@ -131,8 +139,7 @@ with col1:
 with col2:
     render_metric("Completion Rate", f"{stats['rate']}%", "Productivity")
 with col3:
-    entries = db.db.time_entries.find({"user_email": st.session_state.user_email})
-    total_hours = sum(e.get('seconds', 0) for e in entries) / 3600
+    total_hours = data["hours"] / 3600
     render_metric("Hours Logged", f"{total_hours:.1f}h", color="#f6b900")
 
 st.markdown("---")
@@ -142,10 +149,7 @@ c1, c2 = st.columns([2, 1])
 
 with c1:
     st.markdown("<div class='ds-section-title'>My Priorities</div>", unsafe_allow_html=True)
-    my_tasks = db.get_tasks_with_urgency({
-        "assignee": st.session_state.user_email, 
-        "status": {"$ne": "Completed"}
-    })
+    my_tasks = data["my_tasks"]
     
     if not my_tasks:
         st.markdown("""
@@ -176,7 +180,7 @@ with c1:
 
 with c2:
     st.markdown("<div class='ds-section-title'>Recent Inbox</div>", unsafe_allow_html=True)
-    notifs = db.get_unread_notifications(st.session_state.user_email)
+    notifs = data["notifs"]
     
     if not notifs:
         st.info("No new notifications.")
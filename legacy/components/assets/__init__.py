@@ -0,0 +1,79 @@
+"""
+Assets - Inject markup (stylesheets, SVG sprites) into the app document once per session
+The parent document survives reruns and page switches, so anything placed there only
+has to cross the websocket once; later reruns skip the injector entirely.
+"""
+import hashlib
+import re
+import threading
+from pathlib import Path
+import streamlit as st
+import streamlit.components.v1 as components
+
+_injector = components.declare_component(
+    "ds_asset_injector",
+    path=str(Path(__file__).parent / "frontend"),
+)
+
+
+def inject_once(asset_id, markup, group, target="body"):
+    """
+    Place `markup` in the app's <head> or <body> unless this session already did.
+
+    Args:
+        asset_id: Unique id for this exact content (include a content hash)
+        markup: HTML to inject
+        group: Name shared by all versions of the asset; older versions are replaced
+        target: "head" or "body"
+    """
+    injected = st.session_state.setdefault("_assets_injected", set())
+    # Marked before rendering, so a second request in the same rerun (page and sidebar) is a no-op
+    if asset_id in injected:
+        return
+    injected.add(asset_id)
+    # The injector places the markup as it mounts and reports nothing back, so it costs no rerun
+    _injector(asset_id=asset_id, markup=markup, group=group, target=target)
+
+
+_COMMENTS = re.compile(r"/\*.*?\*/", re.S)
+_SPACE = re.compile(r"\s+")
+_AROUND_PUNCT = re.compile(r"\s*([{};,>])\s*")
+
+def minify_css(css):
+    """Drop comments and whitespace that carries no meaning (selectors and values are kept intact)"""
+    css = _COMMENTS.sub("", css)
+    css = _SPACE.sub(" ", css)
+    css = _AROUND_PUNCT.sub(r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+_stylesheets = {}
+_stylesheets_lock = threading.Lock()
+
+def load_stylesheet(path):
+    """
+    Minified stylesheet and its content hash, built once per process.
+    Rebuilt only if the file's mtime changes (so edits still show up during development).
+
+    Returns:
+        (asset_id, css) or (None, "") if the file is missing
+    """
+    path = Path(path)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None, ""
+    cached = _stylesheets.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1], cached[2]
+    css = minify_css(path.read_text(encoding="utf-8"))
+    asset_id = f"ds-css-{path.stem}-{hashlib.sha1(css.encode('utf-8')).hexdigest()[:10]}"
+    with _stylesheets_lock:
+        _stylesheets[path] = (mtime, asset_id, css)
+    return asset_id, css
+
+def inject_stylesheet(path, group="css"):
+    """Inject a stylesheet into <head> once per session; a changed file replaces the old version"""
+    asset_id, css = load_stylesheet(path)
+    if asset_id:
+        inject_once(asset_id, f"<style>{css}</style>", group=group, target="head")
@@ -3,7 +3,11 @@ from .calendar_utils import (
     get_month_matrix,
     is_today,
     group_tasks_by_date,
+    task_day_span,
+    TaskIntervalIndex,
     get_week_range,
+    get_month_bounds,
+    shift_month,
     heat_color,
     assignee_color
 )
@@ -12,6 +16,7 @@ from .calendar_base import (
     calendar_shell_end,
     calendar_header
 )
+from .calendar_component import build_day_buckets, calendar_grid
 from .calendar_month import render_month_view
 from .calendar_week import render_week_view
 
@@ -19,12 +24,18 @@ __all__ = [
     'get_month_matrix',
     'is_today',
     'group_tasks_by_date',
+    'task_day_span',
+    'TaskIntervalIndex',
     'get_week_range',
+    'get_month_bounds',
+    'shift_month',
     'heat_color',
     'assignee_color',
     'calendar_shell_start',
     'calendar_shell_end',
     'calendar_header',
+    'build_day_buckets',
+    'calendar_grid',
     'render_month_view',
     'render_week_view',
 ]
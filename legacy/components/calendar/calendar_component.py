@@ -0,0 +1,73 @@
+"""
+Calendar Component - The whole grid as one HTML/JS component
+Ships a compact JSON payload of day buckets and returns the clicked date,
+instead of one markdown block and one button per day cell.
+"""
+import datetime
+from pathlib import Path
+import streamlit as st
+import streamlit.components.v1 as components
+from .calendar_utils import heat_color, assignee_color
+
+_calendar_grid = components.declare_component(
+    "ds_calendar_grid",
+    path=str(Path(__file__).parent / "frontend"),
+)
+
+
+def _clip(title, limit):
+    title = title or ""
+    return title[:limit] + ("…" if len(title) > limit else "")
+
+
+def build_day_buckets(days, tasks_by_date, color_mode="Priority", preview_limit=3, title_limit=22, heatmap_enabled=False):
+    """
+    Compact payload: {"YYYY-MM-DD": {"n": count, "t": [[title, dot_color], ...], "h": heat}}
+    Days without tasks are omitted unless the heatmap needs their background.
+    """
+    buckets = {}
+    for date_obj in days:
+        day_tasks = tasks_by_date.get(date_obj, [])
+        if not day_tasks and not heatmap_enabled:
+            continue
+        preview = day_tasks if preview_limit is None else day_tasks[:preview_limit]
+        buckets[date_obj.isoformat()] = {
+            "n": len(day_tasks),
+            "t": [
+                [
+                    _clip(t.get("title"), title_limit),
+                    assignee_color(t.get("assignee", "")) if color_mode == "Assignee" else t.get("urgency_color", "#f6b900"),
+                ]
+                for t in preview
+            ],
+            "h": heat_color(len(day_tasks)),
+        }
+    return buckets
+
+
+def calendar_grid(cells, buckets, view="month", heatmap_enabled=False, key="calendar_grid"):
+    """
+    Render the grid and return the clicked date (once per click), or None.
+
+    Args:
+        cells: List of [iso_date, label] per grid cell, or None for padding cells
+        buckets: Payload from build_day_buckets
+        view: "month" or "week" (taller cells)
+    """
+    value = _calendar_grid(
+        headers=['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+        cells=cells,
+        days=buckets,
+        view=view,
+        heatmap=heatmap_enabled,
+        today=datetime.date.today().isoformat(),
+        key=key,
+        default=None,
+    )
+
+    # The component keeps returning its last value; only act on a new click
+    nonce_key = f"{key}_nonce"
+    if value and value.get("nonce") != st.session_state.get(nonce_key):
+        st.session_state[nonce_key] = value.get("nonce")
+        return datetime.date.fromisoformat(value["date"])
+    return None
@@ -16,14 +16,129 @@ def is_today(date_obj):
     return date_obj == datetime.date.today()
 
 
-def group_tasks_by_date(tasks):
-    """Group tasks by their due date"""
-    grouped = {}
-    for t in tasks:
-        if t.get("due_date"):
-            d = t["due_date"].date()
-            grouped.setdefault(d, []).append(t)
-    return grouped
+def task_day_span(task):
+    """(first_day, last_day) a task occupies: start_date (or due_date) through due_date"""
+    due = task.get("due_date")
+    if not due:
+        return None
+    start = task.get("start_date") or due
+    first, last = start.date(), due.date()
+    return (last, last) if first > last else (first, last)
+
+
+class _IntervalNode:
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+
+class TaskIntervalIndex:
+    """
+    Centered interval tree over task day spans.
+    Answers "which tasks overlap [a, b]" in O(log n + k); build once per data fetch
+    and share it between the month, week and heatmap views.
+    """
+
+    def __init__(self, tasks):
+        intervals = []
+        for t in tasks:
+            span = task_day_span(t)
+            if span:
+                intervals.append((span[0].toordinal(), span[1].toordinal(), t))
+        self.size = len(intervals)
+        self._root = self._build(intervals)
+
+    def _build(self, intervals):
+        if not intervals:
+            return None
+        points = sorted(p for lo, hi, _ in intervals for p in (lo, hi))
+        center = points[len(points) // 2]
+
+        left, right, here = [], [], []
+        for iv in intervals:
+            if iv[1] < center:
+                left.append(iv)
+            elif iv[0] > center:
+                right.append(iv)
+            else:
+                here.append(iv)
+
+        node = _IntervalNode()
+        node.center = center
+        node.by_start = sorted(here, key=lambda iv: iv[0])
+        node.by_end = sorted(here, key=lambda iv: iv[1], reverse=True)
+        node.left = self._build(left)
+        node.right = self._build(right)
+        return node
+
+    def overlapping(self, start_date, end_date):
+        """Tasks whose span overlaps [start_date, end_date] (inclusive), each listed once"""
+        a, b = start_date.toordinal(), end_date.toordinal()
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if b < node.center:
+                for lo, hi, t in node.by_start:
+                    if lo > b:
+                        break
+                    found.append((lo, hi, t))
+                stack.append(node.left)
+            elif a > node.center:
+                for lo, hi, t in node.by_end:
+                    if hi < a:
+                        break
+                    found.append((lo, hi, t))
+                stack.append(node.right)
+            else:
+                found.extend(node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        return [t for _, _, t in sorted(found, key=lambda iv: (iv[1], iv[0]))]
+
+    def on_day(self, date_obj):
+        """Tasks active on a single day"""
+        return self.overlapping(date_obj, date_obj)
+
+    def by_day(self, days):
+        """{date: [tasks]} for the given days (days without tasks are omitted)"""
+        grouped = {}
+        for d in days:
+            day_tasks = self.on_day(d)
+            if day_tasks:
+                grouped[d] = day_tasks
+        return grouped
+
+    def counts(self, days):
+        """{date: task count} for heatmap shading"""
+        return {d: len(self.on_day(d)) for d in days}
+
+
+def group_tasks_by_date(tasks, days=None):
+    """
+    Group tasks onto every day their start_date..due_date span covers.
+    Pass `days` (e.g. the visible month) to bound the output; otherwise all covered days are used.
+    """
+    if days is None:
+        spans = [s for s in (task_day_span(t) for t in tasks) if s]
+        if not spans:
+            return {}
+        first = min(s[0] for s in spans)
+        last = max(s[1] for s in spans)
+        days = [first + datetime.timedelta(days=i) for i in range((last - first).days + 1)]
+    return TaskIntervalIndex(tasks).by_day(days)
+
+
+def get_month_bounds(year: int, month: int):
+    """First and last date of the given month"""
+    last_day = calendar.monthrange(year, month)[1]
+    return datetime.date(year, month, 1), datetime.date(year, month, last_day)
+
+
+def shift_month(year: int, month: int, delta: int):
+    """(year, month) moved by delta months"""
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
 
 
 def get_week_range(date_obj):
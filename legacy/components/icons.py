@@ -1,22 +1,130 @@
 import base64
+import hashlib
+import re
+import threading
 from pathlib import Path
 
+ICON_DIR = Path("static/icons")
+SYMBOL_PREFIX = "ds-icon-"
+
+_ROOT_TAG = re.compile(r"<svg\b([^>]*)>(.*)</svg>", re.S)
+_ATTR = re.compile(r'([\w:-]+)="([^"]*)"')
+
+def minify_svg(svg: str) -> str:
+    """Strip XML prolog, comments and insignificant whitespace from an SVG document"""
+    svg = re.sub(r"<\?xml.*?\?>", "", svg, flags=re.S)
+    svg = re.sub(r"<!--.*?-->", "", svg, flags=re.S)
+    svg = re.sub(r">\s+<", "><", svg)
+    svg = re.sub(r"\s+", " ", svg)
+    return svg.replace(" />", "/>").strip()
+
+class IconRegistry:
+    """
+    Loads static/icons/*.svg once per process and memoizes every rendered form:
+    minified markup, data URIs, sized inline wrappers and a single <symbol> sprite.
+    """
+
+    def __init__(self, icon_dir: Path = ICON_DIR):
+        self._svgs = {}
+        if icon_dir.exists():
+            for path in sorted(icon_dir.glob("*.svg")):
+                self._svgs[path.stem] = minify_svg(path.read_text(encoding="utf-8"))
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def _memoized(self, key, build):
+        value = self._memo.get(key)
+        if value is None:
+            value = build()
+            with self._lock:
+                self._memo[key] = value
+        return value
+
+    @property
+    def names(self):
+        return list(self._svgs)
+
+    def svg(self, name: str) -> str:
+        """Minified SVG markup ("" if unknown)"""
+        return self._svgs.get(name, "")
+
+    def data_uri(self, name: str) -> str:
+        if name not in self._svgs:
+            return ""
+        return self._memoized(("uri", name), lambda: "data:image/svg+xml;base64," + base64.b64encode(self._svgs[name].encode("utf-8")).decode("utf-8"))
+
+    def inline(self, name: str, width: int = 24, height: int = 24) -> str:
+        """SVG markup wrapped in a sized, centered div"""
+        if name not in self._svgs:
+            return ""
+        return self._memoized(
+            ("inline", name, width, height),
+            lambda: f'<div style="width:{width}px; height:{height}px; display:flex; align-items:center; justify-content:center;">{self._svgs[name]}</div>',
+        )
+
+    def use(self, name: str, width: int = 24, height: int = 24) -> str:
+        """Reference to the sprite symbol (requires the sprite on the page)"""
+        if name not in self._svgs:
+            return ""
+        return self._memoized(
+            ("use", name, width, height),
+            lambda: f'<div style="width:{width}px; height:{height}px; display:flex; align-items:center; justify-content:center;">'
+                    f'<svg width="{width}" height="{height}"><use href="#{SYMBOL_PREFIX}{name}"/></svg></div>',
+        )
+
+    def sprite(self) -> str:
+        """All icons as <symbol>s in one hidden SVG"""
+        return self._memoized("sprite", self._build_sprite)
+
+    def sprite_id(self) -> str:
+        """Content-hashed element id for the sprite"""
+        return self._memoized("sprite_id", lambda: "ds-icons-" + hashlib.sha1(self.sprite().encode("utf-8")).hexdigest()[:10])
+
+    def _build_sprite(self) -> str:
+        symbols = []
+        for name, svg in self._svgs.items():
+            match = _ROOT_TAG.search(svg)
+            if not match:
+                continue
+            attrs = dict(_ATTR.findall(match.group(1)))
+            view_box = attrs.pop("viewBox", "0 0 24 24")
+            for skip in ("xmlns", "width", "height", "class", "style"):
+                attrs.pop(skip, None)
+            presentation = "".join(f' {k}="{v}"' for k, v in attrs.items())
+            symbols.append(
+                f'<symbol id="{SYMBOL_PREFIX}{name}" viewBox="{view_box}"><g{presentation}>{match.group(2)}</g></symbol>'
+            )
+        return f'<svg xmlns="http://www.w3.org/2000/svg" style="display:none">{"".join(symbols)}</svg>'
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_icon_registry() -> IconRegistry:
+    """Process-wide registry, loaded on first use"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = IconRegistry()
+    return _registry
+
 def svg_data_uri(path: str) -> str:
     """Convert SVG file to data URI for inline embedding"""
     svg_path = Path(path)
+    if svg_path.parent == ICON_DIR:
+        return get_icon_registry().data_uri(svg_path.stem)
     if not svg_path.exists():
         return ""
-    
+
     with open(svg_path, "rb") as f:
         encoded = base64.b64encode(f.read()).decode("utf-8")
     return f"data:image/svg+xml;base64,{encoded}"
 
 def render_icon(name: str, size: int = 18) -> str:
     """Render an SVG icon inline"""
-    icon_path = f"static/icons/{name}.svg"
-    uri = svg_data_uri(icon_path)
-    
+    uri = get_icon_registry().data_uri(name)
+
     if not uri:
         return ""
-    
+
     return f'<img src="{uri}" class="ds-icon" style="width:{size}px; height:{size}px;" />'
@@ -0,0 +1,48 @@
+"""
+Timer - Running-timer card that ticks in the browser
+The server renders it once with the start time; the clock then advances locally,
+so a running timer costs no reruns and no queries.
+"""
+import html
+import streamlit.components.v1 as components
+
+TIMER_TEMPLATE = """
+<div style="font-family:Poppins, sans-serif; background:#2a1220; border:1px solid rgba(255,255,255,0.10);
+            border-radius:14px; padding:12px 14px; box-shadow:0 4px 12px rgba(0,0,0,0.22);">
+    <div style="font-size:0.8rem; color:#fff; opacity:0.7;">TRACKING TIME</div>
+    <div id="ds-timer" style="font-size:1.4rem; font-weight:900; color:#f6b900;">00:00:00</div>
+    <div style="font-size:0.75rem; color:#f6b900; white-space:nowrap; overflow:hidden; text-overflow:ellipsis;">__TITLE__</div>
+</div>
+<script>
+    const started = __STARTED_MS__;
+    const display = document.getElementById("ds-timer");
+    function pad(n) { return String(n).padStart(2, "0"); }
+    function tick() {
+        const elapsed = Math.max(0, Math.floor((Date.now() - started) / 1000));
+        const h = Math.floor(elapsed / 3600), m = Math.floor((elapsed % 3600) / 60), s = elapsed % 60;
+        display.textContent = pad(h) + ":" + pad(m) + ":" + pad(s);
+    }
+    tick();
+    setInterval(tick, 1000);
+</script>
+"""
+
+
+def render_running_timer(started_at_ms, task_title, height=96):
+    """
+    Render the ticking timer card.
+
+    Args:
+        started_at_ms: Timer start as a Unix epoch in milliseconds
+        task_title: Task being tracked
+        height: iframe height in px
+
+    The markup only changes when a different timer starts, so reruns reuse the
+    existing iframe and the clock keeps running without a reload.
+    """
+    markup = (
+        TIMER_TEMPLATE
+        .replace("__STARTED_MS__", str(int(started_at_ms)))
+        .replace("__TITLE__", html.escape(task_title or "Unknown Task"))
+    )
+    components.html(markup, height=height)
@@ -1,7 +1,7 @@
 import streamlit as st
-import pandas as pd
 from src.database import DreamShiftDB
 from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg
+from src.session import current_user
 
 st.set_page_config(page_title="Admin Panel", layout="wide")
 load_global_css()
@@ -10,7 +10,7 @@ render_custom_sidebar()
 db = DreamShiftDB()
 
 # Auth Check
-user = db.get_user(st.session_state.user_email)
+user = current_user(db)
 if not user or user.get('role') != "Admin": # Assuming 'Admin' role string
     # Fallback for Owner of workspace if not system admin
     # In a real app, strict RBAC needed.
@@ -23,21 +23,60 @@ tab1, tab2 = st.tabs(["User Management", "System Health"])
 
 with tab1:
     st.subheader("Registered Users")
-    users = list(db.db.users.find({}, {"password": 0})) # Exclude passwords
-    df = pd.DataFrame(users)
-    if not df.empty:
-        st.dataframe(df[['name', 'email', 'role', 'created_at']], use_container_width=True)
+    PAGE_SIZE = 50
+    SORT_LABELS = {"Email": "email", "Name": "name", "Joined": "created_at"}
+
+    c_search, c_sort, c_dir = st.columns([3, 1, 1])
+    search = c_search.text_input("Search", placeholder="Email or name starts with…", label_visibility="collapsed")
+    sort_label = c_sort.selectbox("Sort by", list(SORT_LABELS), label_visibility="collapsed")
+    descending = c_dir.selectbox("Order", ["Ascending", "Descending"], label_visibility="collapsed") == "Descending"
+
+    # Cursor stack for Prev/Next; any change to search or sort starts again at page 1
+    view = (search.strip(), SORT_LABELS[sort_label], descending)
+    if st.session_state.get("admin_users_view") != view:
+        st.session_state.admin_users_view = view
+        st.session_state.admin_users_cursors = [None]
+    cursors = st.session_state.admin_users_cursors
+
+    rows, next_cursor = db.list_users_page(
+        search=view[0], sort=view[1], descending=descending, after=cursors[-1], limit=PAGE_SIZE
+    )
+    if rows:
+        st.dataframe(
+            [{"name": u.get("name"), "email": u.get("email"), "role": u.get("role"), "created_at": u.get("created_at")} for u in rows],
+            use_container_width=True,
+        )
+    else:
+        st.caption("No users match.")
+
+    c_prev, c_page, c_next = st.columns([1, 2, 1])
+    if c_prev.button("Previous", disabled=len(cursors) == 1, use_container_width=True):
+        cursors.pop()
+        st.rerun()
+    c_page.caption(f"Page {len(cursors)}")
+    if c_next.button("Next", disabled=next_cursor is None, use_container_width=True):
+        cursors.append(next_cursor)
+        st.rerun()
     
     st.subheader("Grant Admin Access")
     with st.form("grant_admin"):
         email = st.text_input("User Email")
         if st.form_submit_button("Promote to Admin"):
-            db.db.users.update_one({"email": email}, {"$set": {"role": "Admin"}})
+            db.set_user_role(email, "Admin")
             st.success(f"{email} is now an Admin.")
 
 with tab2:
     st.subheader("Database Stats")
+    counts = db.get_admin_counts()
     c1, c2, c3 = st.columns(3)
-    c1.metric("Total Users", db.db.users.count_documents({}))
-    c2.metric("Total Tasks", db.db.tasks.count_documents({}))
-    c3.metric("Workspaces", db.db.workspaces.count_documents({}))
\ No newline at end of file
+    c1.metric("Total Users", counts["users"])
+    c2.metric("Total Tasks", counts["tasks"])
+    c3.metric("Workspaces", counts["workspaces"])
+
+    st.subheader("Query Cache (this process)")
+    cache = db.query_cache_stats()
+    q1, q2, q3, q4 = st.columns(4)
+    q1.metric("Hit Rate", f"{cache['hit_rate'] * 100:.0f}%")
+    q2.metric("Hits / Misses", f"{cache['hits']} / {cache['misses']}")
+    q3.metric("Entries", cache["size"])
+    q4.metric("Invalidations", cache["invalidations"])
@@ -1,8 +1,9 @@
 import streamlit as st
 import datetime
+import time
 from src.database import DreamShiftDB
 from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg
-from components.calendar import render_month_view, group_tasks_by_date
+from components.calendar import render_month_view, get_month_bounds, shift_month, TaskIntervalIndex
 
 st.set_page_config(page_title="Calendar", layout="wide")
 load_global_css()
@@ -30,9 +31,34 @@ with c2:
 
 st.markdown(f"### {view_date.strftime('%B %Y')}")
 
-# Fetch Tasks
-tasks = db.get_tasks_with_urgency({"workspace_id": st.session_state.get("current_ws_id")})
-tasks_by_date = group_tasks_by_date(tasks)
+# Fetch Tasks (visible month, plus adjacent months prefetched in the same query)
+# One interval index per fetch serves every month in that window. Keys carry the
+# workspace's query-cache version, so a task write retires the index immediately.
+CALENDAR_CACHE_TTL = 60
+
+def get_month_index(ws_id, year, month):
+    cache = st.session_state.setdefault("calendar_month_cache", {})
+    version = db.query_cache_version(ws_id) if ws_id else None
+    key = (ws_id, version, year, month)
+    cached = cache.get(key)
+    if cached and time.time() - cached[0] < CALENDAR_CACHE_TTL:
+        return cached[1]
+
+    months = [shift_month(year, month, d) for d in (-1, 0, 1)]
+    range_start = get_month_bounds(*months[0])[0]
+    range_end = get_month_bounds(*months[-1])[1]
+    index = TaskIntervalIndex(db.get_calendar_tasks(ws_id, range_start, range_end) if ws_id else [])
+
+    fetched_at = time.time()
+    for stale in [k for k, (at, _) in cache.items() if fetched_at - at >= CALENDAR_CACHE_TTL]:
+        del cache[stale]
+    for y, m in months:
+        cache[(ws_id, version, y, m)] = (fetched_at, index)
+    return index
+
+month_start, month_end = get_month_bounds(view_date.year, view_date.month)
+month_days = [month_start + datetime.timedelta(days=i) for i in range((month_end - month_start).days + 1)]
+tasks_by_date = get_month_index(st.session_state.get("current_ws_id"), view_date.year, view_date.month).by_day(month_days)
 
 # Render Grid
 render_month_view(view_date.year, view_date.month, tasks_by_date, color_mode="Priority")
\ No newline at end of file
@@ -1,6 +1,7 @@
 import streamlit as st
 from src.database import DreamShiftDB
 from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg
+from src.session import current_user
 
 st.set_page_config(page_title="Profile", layout="wide")
 load_global_css()
@@ -11,7 +12,7 @@ db = DreamShiftDB()
 icon = get_svg("profile.svg", 36, 36) or ":material/person:"
 st.markdown(f"""<div class="ds-header-flex">{icon}<h1 class="ds-header-title">Profile</h1></div>""", unsafe_allow_html=True)
 
-user = db.get_user(st.session_state.user_email)
+user = current_user(db)
 stats = db.get_user_stats(st.session_state.user_email)
 
 col1, col2 = st.columns([1, 2])
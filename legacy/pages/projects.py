@@ -1,7 +1,7 @@
 import streamlit as st
 import datetime
 from src.database import DreamShiftDB
-from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg
+from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg, get_cached_workspaces
 
 st.set_page_config(page_title="Projects", layout="wide")
 load_global_css()
@@ -18,7 +18,7 @@ icon = get_svg("projects.svg", 36, 36) or ":material/folder:"
 st.markdown(f"""<div class="ds-header-flex">{icon}<h1 class="ds-header-title">Projects</h1></div>""", unsafe_allow_html=True)
 
 # Fetch Workspaces for Dropdown
-user_workspaces = db.get_user_workspaces(user_email)
+user_workspaces = get_cached_workspaces(db)
 ws_options = {w['name']: str(w['_id']) for w in user_workspaces}
 
 # Default to current workspace if set
@@ -72,7 +72,7 @@ with st.expander("Create New Project", expanded=False):
                     "status": "Active"
                 }
                 
-                proj_id = db.db.projects.insert_one(proj_data).inserted_id
+                proj_id = db.create_project(proj_data)
 
                 if selected_template:
                     for t in selected_template.get("tasks", []):
@@ -107,7 +107,7 @@ with st.expander("Create New Project", expanded=False):
 # --- PROJECT GRID ---
 # Filter by selected workspace
 if current_ws_id:
-    all_projects = list(db.db.projects.find({"workspace_id": current_ws_id}))
+    all_projects = db.get_workspace_projects(current_ws_id)
     status_options = sorted({p.get("status", "Active") for p in all_projects}) or ["Active"]
     f1, f2 = st.columns([2, 1])
     with f1:
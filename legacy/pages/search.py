@@ -0,0 +1,73 @@
+import html
+import streamlit as st
+from src.database import DreamShiftDB
+from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg
+
+st.set_page_config(page_title="Search", layout="wide")
+load_global_css()
+hide_streamlit_sidebar()
+render_custom_sidebar()
+db = DreamShiftDB()
+
+PAGE_SIZE = 20
+KIND_LABELS = {"task": "Task", "project": "Project", "comment": "Comment"}
+
+icon = get_svg("search.svg", 36, 36) or ":material/search:"
+st.markdown(f"""<div class="ds-header-flex">{icon}<h1 class="ds-header-title">Search</h1></div>""", unsafe_allow_html=True)
+
+query = st.text_input(
+    "Search",
+    value=st.session_state.get("search_query", ""),
+    placeholder="Tasks, projects and comments…",
+    label_visibility="collapsed",
+)
+if query != st.session_state.get("search_query"):
+    st.session_state.search_query = query
+    st.session_state.search_page = 0
+page = st.session_state.get("search_page", 0)
+
+if not query.strip():
+    st.caption("Type a word or phrase. Use quotes for an exact phrase and -word to exclude.")
+    st.stop()
+
+hits, has_more = db.search(st.session_state.user_email, query, page=page, page_size=PAGE_SIZE)
+
+if not hits:
+    st.markdown("""
+    <div class="ds-card" style="text-align:center; padding:40px; opacity:0.75;">
+        <div style="font-size:1.1rem; font-weight:800;">No matches</div>
+        <div style="color:var(--text-muted); margin-top:4px;">Try fewer or different words.</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+for h in hits:
+    c1, c2 = st.columns([0.85, 0.15])
+    with c1:
+        st.markdown(f"""
+        <div class="ds-card" style="padding:12px 16px; margin-bottom:10px;">
+            <div style="display:flex; gap:8px; align-items:center;">
+                <span class="ds-pill">{KIND_LABELS.get(h['kind'], h['kind'])}</span>
+                <span style="font-weight:800;">{html.escape(h['title'])}</span>
+            </div>
+            <div style="color:var(--text-muted); margin-top:6px;">{html.escape(h['snippet'])}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    with c2:
+        target_type, target_id = h["target"]
+        if st.button("Open", key=f"open_{h['kind']}_{h['id']}", use_container_width=True):
+            st.session_state.current_ws_id = h["workspace_id"]
+            if target_type == "project":
+                st.session_state.selected_project_id = target_id
+                st.switch_page("pages/project-details.py")
+            else:
+                st.session_state.selected_task_id = target_id
+                st.switch_page("pages/task-details.py")
+
+c_prev, c_page, c_next = st.columns([1, 2, 1])
+if c_prev.button("Previous", disabled=page == 0, use_container_width=True):
+    st.session_state.search_page = page - 1
+    st.rerun()
+c_page.caption(f"Page {page + 1}")
+if c_next.button("Next", disabled=not has_more, use_container_width=True):
+    st.session_state.search_page = page + 1
+    st.rerun()
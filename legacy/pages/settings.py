@@ -1,6 +1,8 @@
+import os
 import streamlit as st
 from src.database import DreamShiftDB
 from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg
+from src.session import current_user
 
 st.set_page_config(page_title="Settings", layout="wide")
 load_global_css()
@@ -11,15 +13,26 @@ db = DreamShiftDB()
 icon = get_svg("settings.svg", 36, 36) or ":material/settings:"
 st.markdown(f"""<div class="ds-header-flex">{icon}<h1 class="ds-header-title">Settings</h1></div>""", unsafe_allow_html=True)
 
-user = db.get_user(st.session_state.user_email)
-prefs = user.get("preferences", {})
+user = current_user(db)
+prefs = user.get("preferences", {}) if user else {}
 
 st.markdown("<div class='ds-section-title'>Notifications</div>", unsafe_allow_html=True)
 email_notif = st.toggle("Receive Email Notifications", value=prefs.get("email_notifications", True))
 
 if st.button("Save Changes"):
-    db.db.users.update_one(
-        {"email": st.session_state.user_email},
-        {"$set": {"preferences": {"email_notifications": email_notif}}}
-    )
-    st.success("Preferences saved!")
\ No newline at end of file
+    db.update_user_preferences(st.session_state.user_email, {"email_notifications": email_notif})
+    current_user(db, refresh=True)
+    st.success("Preferences saved!")
+
+st.markdown("<div class='ds-section-title'>Calendar Feed</div>", unsafe_allow_html=True)
+st.caption("Subscribe from Google Calendar, Outlook or Apple Calendar. Anyone with the link can read it.")
+feed_base = os.getenv("ICS_BASE_URL", "http://localhost:8502").rstrip("/")
+feed_token = db.get_feed_token(st.session_state.user_email)
+st.code(f"{feed_base}/feeds/{feed_token}.ics", language=None)
+ws_id = st.session_state.get("current_ws_id")
+if ws_id:
+    st.caption("Current workspace")
+    st.code(f"{feed_base}/feeds/{feed_token}/{ws_id}.ics", language=None)
+if st.button("Reset Feed Link"):
+    db.get_feed_token(st.session_state.user_email, reset=True)
+    st.rerun()
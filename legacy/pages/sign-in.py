@@ -2,6 +2,7 @@ import streamlit as st
 import time
 from src.database import DreamShiftDB
 from src.ui import load_global_css
+from src.session import issue_claim
 
 st.set_page_config(page_title="Sign In", page_icon="static/icons/home.svg", layout="centered", initial_sidebar_state="collapsed")
 load_global_css()
@@ -36,8 +37,7 @@ if db_connected:
             if st.form_submit_button("Sign In", use_container_width=True):
                 user = db.authenticate_user(email, password)
                 if user:
-                    st.session_state.user_email = email
-                    st.session_state.user_name = user['name']
+                    issue_claim(user)
                     st.success(f"Welcome back, {user['name']}!")
                     time.sleep(0.5)
                     st.switch_page("Home.py")
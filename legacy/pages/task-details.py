@@ -1,9 +1,9 @@
 import streamlit as st
-import time
 import datetime
 from bson import ObjectId
 from src.database import DreamShiftDB
-from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar
+from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, rerun_fragment, start_timer, stop_timer
+from components.timer import render_running_timer
 from src.chat_ui import render_chat_interface
 try:
     from src.mailer import notify_admins_extension
@@ -35,10 +35,11 @@ col_title.markdown(f"## <span style='color:#f6b900;'>{task.get('title')}</span>"
 # --- MAIN LAYOUT ---
 left, right = st.columns([2, 1])
 
-with left:
-    # --- SUBTASKS ---
-    st.markdown("### Subtasks")
-    subtasks = task.get('subtasks', [])
+@st.fragment
+def render_subtasks(tid):
+    """Checklist + add form; toggling or adding reruns only this fragment"""
+    doc = db.db.tasks.find_one({"_id": ObjectId(tid)}, {"subtasks": 1}) or {}
+    subtasks = doc.get('subtasks', [])
     
     # Progress Bar
     if subtasks:
@@ -52,7 +53,7 @@ with left:
         checked = c1.checkbox("", value=s['completed'], key=f"sub_{s['id']}")
         if checked != s['completed']:
             db.toggle_subtask(tid, s['id'], checked)
-            st.rerun()
+            rerun_fragment()
         c2.write(s['title'])
         
     # Add Subtask
@@ -61,7 +62,12 @@ with left:
         if st.form_submit_button("Add"):
             if new_sub:
                 db.add_subtask(tid, new_sub)
-                st.rerun()
+                rerun_fragment()
+
+with left:
+    # --- SUBTASKS ---
+    st.markdown("### Subtasks")
+    render_subtasks(tid)
 
     # --- COMMENTS ---
     render_chat_interface(tid, "task")
@@ -118,29 +124,26 @@ with right:
     # TIME TRACKING
     st.markdown("### Time Tracking")
     
-    # Start/Stop Logic
+    # Start/Stop Logic (the running timer lives in active_timers; the clock ticks client-side)
+    notice = st.session_state.pop("timer_notice", None)
+    if notice:
+        st.info(notice)
     if st.session_state.get('timer_running') and st.session_state.get('timer_task_id') == tid:
-        elapsed = int(time.time() - st.session_state.timer_start)
-        st.info(f"Tracking: {elapsed}s")
+        render_running_timer(st.session_state.timer_start * 1000, task['title'])
         if st.button("Stop Timer", type="primary", use_container_width=True):
-            db.log_time_entry(tid, st.session_state.user_email, elapsed)
-            st.session_state.timer_running = False
-            st.session_state.timer_start = None
+            stop_timer(db)
             st.rerun()
     else:
         if st.button("Start Timer", use_container_width=True):
-            st.session_state.timer_running = True
-            st.session_state.timer_start = time.time()
-            st.session_state.timer_task_id = tid
-            st.session_state.timer_task_title = task['title']
+            start_timer(db, tid, task['title'])
             st.rerun()
 
     # Time Logs
-    logs = db.get_task_time_entries(tid)
-    total_sec = sum(l['seconds'] for l in logs)
+    total_sec = db.get_task_time_total(tid)
     st.caption(f"Total Time: {total_sec//3600}h {(total_sec%3600)//60}m")
     
     with st.expander("View Logs"):
+        logs = db.get_task_time_entries(tid)
         for l in logs:
             st.write(f"• {l['seconds']//60}m by {l.get('user_email', 'User')}")
 
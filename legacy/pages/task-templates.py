@@ -1,6 +1,6 @@
 import streamlit as st
 from src.database import DreamShiftDB
-from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg
+from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg, get_cached_workspaces
 
 st.set_page_config(page_title="Task Templates", layout="wide")
 load_global_css()
@@ -18,7 +18,7 @@ st.markdown(f"""<div class="ds-header-flex">{icon}<h1 class="ds-header-title">Te
 st.write("Manage Task Templates")
 
 # Workspace selector
-workspaces = db.get_user_workspaces(user_email)
+workspaces = get_cached_workspaces(db)
 ws_options = {w["name"]: str(w["_id"]) for w in workspaces}
 current_ws_id = st.session_state.get("current_ws_id")
 default_ws_index = 0
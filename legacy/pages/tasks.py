@@ -1,7 +1,7 @@
 import streamlit as st
 import datetime
 from src.database import DreamShiftDB
-from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg
+from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg, live_data, LIVE_RUN_EVERY
 
 st.set_page_config(page_title="Tasks", layout="wide")
 load_global_css()
@@ -92,51 +92,54 @@ with f1:
 with f2:
     priority_filter = st.multiselect("Filter by Priority", ["Low", "Medium", "High", "Critical"], default=[])
 
-query = {"workspace_id": ws_id}
-if status_filter:
-    query["status"] = {"$in": status_filter}
-if priority_filter:
-    query["priority"] = {"$in": priority_filter}
+@st.fragment(run_every=LIVE_RUN_EVERY)
+def render_board(ws_id, status_filter, priority_filter):
+    """Kanban columns; with the change feed on, other people's task changes appear without a page rerun"""
+    tasks = live_data(
+        f"board:{ws_id}:{status_filter}:{priority_filter}",
+        (f"tasks:{ws_id}", "tasks"),
+        lambda: db.get_workspace_board(ws_id, status_filter, priority_filter),
+    )
 
-tasks = db.get_tasks_with_urgency(query)
+    if not tasks:
+        st.info("No active tasks in this workspace.")
+    else:
+        # Group tasks by status
+        status_order = [s for s in statuses if s in status_filter] if status_filter else statuses
+        grouped = {s: [] for s in status_order}
+        for t in tasks:
+            s = t.get("status") or "To Do"
+            if s in grouped:
+                grouped[s].append(t)
 
-if not tasks:
-    st.info("No active tasks in this workspace.")
-else:
-    # Group tasks by status
-    status_order = [s for s in statuses if s in status_filter] if status_filter else statuses
-    grouped = {s: [] for s in status_order}
-    for t in tasks:
-        s = t.get("status") or "To Do"
-        if s in grouped:
-            grouped[s].append(t)
+        cols = st.columns(len(status_order) if status_order else 1)
+        for idx, status in enumerate(status_order):
+            with cols[idx]:
+                status_key = status.lower().replace(' ', '-')
+                st.markdown(f"<div class='ds-status ds-status--{status_key}' style='margin-bottom:10px;'>{status}</div>", unsafe_allow_html=True)
+                if not grouped.get(status):
+                    st.caption("No tasks")
+                for t in grouped.get(status, []):
+                    urgency_color = t.get('urgency_color', '#ccc')
+                    priority_key = (t.get('priority') or '').lower()
+                    assignee_name = next((k for k, v in member_lookup.items() if v == t.get('assignee')), 'Unassigned')
 
-    cols = st.columns(len(status_order) if status_order else 1)
-    for idx, status in enumerate(status_order):
-        with cols[idx]:
-            status_key = status.lower().replace(' ', '-')
-            st.markdown(f"<div class='ds-status ds-status--{status_key}' style='margin-bottom:10px;'>{status}</div>", unsafe_allow_html=True)
-            if not grouped.get(status):
-                st.caption("No tasks")
-            for t in grouped.get(status, []):
-                urgency_color = t.get('urgency_color', '#ccc')
-                priority_key = (t.get('priority') or '').lower()
-                assignee_name = next((k for k, v in member_lookup.items() if v == t.get('assignee')), 'Unassigned')
-
-                with st.container():
-                    st.markdown(f"""
-                    <div class="ds-card" style="padding: 12px; margin-bottom: 10px;">
-                        <div style="font-weight: 700; font-size: 1rem; margin-bottom: 6px; color: #f6b900;">{t['title']}</div>
-                        <div class="ds-meta" style="flex-wrap:wrap;">
-                            <span class="ds-meta-item">Assignee: {assignee_name}</span>
-                            <span class="ds-meta-item" style="border-color:{urgency_color}; color:{urgency_color};">Due: {t.get('due_date').strftime('%b %d') if t.get('due_date') else 'No Date'}</span>
-                            <span class="ds-priority--{priority_key} ds-status">Priority: {t.get('priority')}</span>
+                    with st.container():
+                        st.markdown(f"""
+                        <div class="ds-card" style="padding: 12px; margin-bottom: 10px;">
+                            <div style="font-weight: 700; font-size: 1rem; margin-bottom: 6px; color: #f6b900;">{t['title']}</div>
+                            <div class="ds-meta" style="flex-wrap:wrap;">
+                                <span class="ds-meta-item">Assignee: {assignee_name}</span>
+                                <span class="ds-meta-item" style="border-color:{urgency_color}; color:{urgency_color};">Due: {t.get('due_date').strftime('%b %d') if t.get('due_date') else 'No Date'}</span>
+                                <span class="ds-priority--{priority_key} ds-status">Priority: {t.get('priority')}</span>
+                            </div>
                         </div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                        """, unsafe_allow_html=True)
+
+                        btn_col = st.columns([1])
+                        with btn_col[0]:
+                            if st.button("Open", key=f"open_{t['_id']}", help="Open Details", use_container_width=True):
+                                st.session_state.selected_task_id = str(t['_id'])
+                                st.switch_page("pages/task-details.py")
 
-                    btn_col = st.columns([1])
-                    with btn_col[0]:
-                        if st.button("Open", key=f"open_{t['_id']}", help="Open Details", use_container_width=True):
-                            st.session_state.selected_task_id = str(t['_id'])
-                            st.switch_page("pages/task-details.py")
\ No newline at end of file
+render_board(ws_id, tuple(status_filter), tuple(priority_filter))
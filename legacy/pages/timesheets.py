@@ -0,0 +1,84 @@
+import streamlit as st
+import datetime
+import os
+import tempfile
+from src.database import DreamShiftDB
+from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg, get_cached_workspaces
+from src.timesheet import export_timesheet, FORMATS
+
+st.set_page_config(page_title="Timesheets", layout="wide")
+load_global_css()
+hide_streamlit_sidebar()
+render_custom_sidebar()
+db = DreamShiftDB()
+
+user_email = st.session_state.get("user_email")
+if not user_email:
+    st.warning("Please sign in to continue.")
+    st.switch_page("pages/sign-in.py")
+
+icon = get_svg("calendar.svg", 36, 36) or ":material/schedule:"
+st.markdown(f"""<div class="ds-header-flex">{icon}<h1 class="ds-header-title">Timesheets</h1></div>""", unsafe_allow_html=True)
+st.caption("Export logged time joined with task, project and member names for billing.")
+
+today = datetime.date.today()
+# Exports never reach beyond the workspaces the user belongs to
+member_ws_ids = [str(w["_id"]) for w in get_cached_workspaces(db)]
+ws_id = st.session_state.get("current_ws_id")
+if ws_id not in member_ws_ids:
+    ws_id = None
+
+with st.form("timesheet_export"):
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        start_date = st.date_input("From", value=today.replace(day=1))
+    with c2:
+        end_date = st.date_input("To", value=today)
+    with c3:
+        fmt_label = st.selectbox("Format", list(FORMATS.keys()))
+    current_only = st.checkbox(
+        "Current workspace only", value=bool(ws_id), disabled=not ws_id,
+        help="Otherwise every workspace you are a member of",
+    )
+
+    submitted = st.form_submit_button("Generate Export", type="primary", use_container_width=True)
+
+if submitted:
+    if start_date > end_date:
+        st.error("Start date must be on or before end date.")
+    else:
+        previous = st.session_state.pop("timesheet_export", None)
+        if previous and os.path.exists(previous["path"]):
+            os.remove(previous["path"])
+
+        fmt = FORMATS[fmt_label]
+        fd, path = tempfile.mkstemp(suffix=f".{fmt}")
+        os.close(fd)
+        try:
+            with st.spinner("Exporting time entries..."):
+                rows = export_timesheet(
+                    db, path, start_date, end_date,
+                    [ws_id] if current_only and ws_id else member_ws_ids,
+                    fmt=fmt,
+                )
+            st.session_state.timesheet_export = {
+                "path": path,
+                "rows": rows,
+                "name": f"timesheet_{start_date}_{end_date}.{fmt}",
+                "mime": "text/csv" if fmt == "csv" else "application/octet-stream",
+            }
+        except Exception as e:
+            os.remove(path)
+            st.error(f"Export failed: {e}")
+
+export = st.session_state.get("timesheet_export")
+if export and os.path.exists(export["path"]):
+    st.success(f"{export['rows']} time entries exported.")
+    with open(export["path"], "rb") as f:
+        st.download_button(
+            "Download Timesheet",
+            data=f,
+            file_name=export["name"],
+            mime=export["mime"],
+            use_container_width=True,
+        )
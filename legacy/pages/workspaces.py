@@ -1,6 +1,6 @@
 import streamlit as st
 from src.database import DreamShiftDB
-from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg
+from src.ui import load_global_css, hide_streamlit_sidebar, render_custom_sidebar, get_svg, get_cached_workspaces
 
 st.set_page_config(page_title="Workspaces", layout="wide")
 load_global_css()
@@ -15,7 +15,7 @@ st.markdown(f"""<div class="ds-header-flex">{icon}<h1 class="ds-header-title">Wo
 
 # Workspace Selector logic if None selected
 if not ws_id:
-    workspaces = db.get_user_workspaces(st.session_state.user_email)
+    workspaces = get_cached_workspaces(db)
     if not workspaces:
         st.info("No workspaces found. Create one!")
         with st.form("create_ws"):
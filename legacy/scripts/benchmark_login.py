@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark
+Simulates a burst of concurrent logins (one thread per session, like Streamlit)
+and measures login throughput and latency, plus how long a light "rerun" on
+another session is delayed while the burst is hashing.
+
+    python scripts/benchmark_login.py --logins 64 --sessions 16
+    BCRYPT_ROUNDS=10 BCRYPT_WORKERS=2 python scripts/benchmark_login.py
+
+No database is needed: it exercises src.passwords, which is what login spends its CPU on.
+"""
+
+import argparse
+import statistics
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import passwords
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def _probe(stop, delays, interval=0.01):
+    """Stands in for other sessions' reruns: wakes every `interval` and records how late it was"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        time.sleep(interval)
+        delays.append(max(0.0, time.perf_counter() - expected))
+
+def benchmark_login(logins=64, sessions=16):
+    stored = passwords.hash_password("correct horse battery staple")
+
+    def login(_):
+        started = time.perf_counter()
+        ok, _ = passwords.verify_password("correct horse battery staple", stored)
+        if not ok:
+            raise RuntimeError("verification failed")
+        return time.perf_counter() - started
+
+    delays = []
+    stop = threading.Event()
+    probe = threading.Thread(target=_probe, args=(stop, delays), daemon=True)
+    probe.start()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as sessions_pool:
+        latencies = list(sessions_pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    probe.join()
+
+    print(f"\n{'='*60}")
+    print(f"Login Benchmark")
+    print(f"{'='*60}")
+    print(f"bcrypt cost: {passwords.BCRYPT_ROUNDS}  hashing workers: {passwords.HASH_WORKERS}  sessions: {sessions}")
+    print(f"Logins: {logins} in {elapsed:.2f}s  ({logins / elapsed:.1f} logins/s)")
+    print(f"Login latency p50: {statistics.median(latencies) * 1000:.0f}ms  p95: {_percentile(latencies, 95) * 1000:.0f}ms")
+    if delays:
+        print(f"Other-session stall p50: {statistics.median(delays) * 1000:.1f}ms  max: {max(delays) * 1000:.1f}ms")
+
+    return logins / elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent login password verification")
+    parser.add_argument("--logins", type=int, default=64, help="Total logins in the burst")
+    parser.add_argument("--sessions", type=int, default=16, help="Concurrent sessions attempting to log in")
+    args = parser.parse_args()
+
+    try:
+        benchmark_login(args.logins, args.sessions)
+        sys.exit(0)
+    except Exception as e:
+        print(f"FATAL ERROR: {e}")
+        sys.exit(1)
@@ -2,93 +2,123 @@
 """
 Cron job to generate recurring task instances
 Run this daily: 0 0 * * * /path/to/python scripts/generate_recurring_tasks.py
+
+Work is split into _id-range shards leased through MongoDB, so several processes
+(and several cron hosts firing at once) share one run without double-generating.
+Shards held by a crashed worker are picked up again once their lease expires:
+workers keep polling until every shard is done, and rerunning the same run_id
+waits out and reclaims leases left behind by an earlier, crashed run.
 """
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.database import DreamShiftDB
+import argparse
 import datetime
+import multiprocessing
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.database import DreamShiftDB
+
+SERIES_PER_BATCH = 500
+# Longest sleep between claim attempts while other workers' leases are outstanding
+POLL_SECONDS = 5
+
+def process_shards(run_id, lease_seconds):
+    """
+    Worker loop: claim shards until every shard of the run is done, renewing the lease
+    after every batch. While the remaining shards are leased elsewhere it polls, so a
+    shard whose worker crashed is reclaimed once its lease expires.
+    """
+    db = DreamShiftDB()
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    results = []
+
+    while True:
+        shard = db.claim_recurrence_shard(run_id, owner, lease_seconds)
+        if not shard:
+            wait = db.recurrence_wait_seconds(run_id)
+            if wait is None:
+                break
+            time.sleep(min(max(wait, 1), POLL_SECONDS))
+            continue
+
+        started = time.time()
+        summary = {"series": 0, "generated": 0, "duplicates": 0, "stopped": 0}
+        series = db.get_recurring_tasks(shard["lower"], shard["upper"])
+        lost = False
+        for i in range(0, len(series), SERIES_PER_BATCH):
+            batch = db.generate_recurring_tasks(tasks=series[i:i + SERIES_PER_BATCH])
+            for key in summary:
+                summary[key] += batch[key]
+            if not db.renew_recurrence_lease(shard["_id"], owner, lease_seconds):
+                lost = True
+                break
 
-def generate_recurring_tasks():
-    """Generate new instances of recurring tasks"""
+        summary["seconds"] = round(time.time() - started, 3)
+        if not lost:
+            db.complete_recurrence_shard(shard["_id"], owner, summary)
+        results.append({"shard": shard["index"], "attempt": shard["attempts"], "lost_lease": lost, **summary})
+
+    return results
+
+def generate_recurring_tasks(workers=4, shards=16, lease_seconds=120, run_id=None):
+    """Generate new instances of recurring tasks across a pool of worker processes"""
+    run_id = run_id or datetime.datetime.utcnow().strftime("%Y-%m-%d")
     db = DreamShiftDB()
-    
-    # Get all recurring tasks
-    recurring_tasks = db.get_recurring_tasks()
-    
-    generated_count = 0
+
+    started = time.time()
+    db.plan_recurrence_shards(run_id, shards)
+
+    results = []
     errors = []
-    
-    for task in recurring_tasks:
-        try:
-            task_id = str(task['_id'])
-            
-            # Check if end date has passed
-            if 'end_date' in task.get('recurring', {}) and task['recurring']['end_date']:
-                if datetime.datetime.now() > task['recurring']['end_date']:
-                    print(f"Stopping expired recurring task: {task['title']}")
-                    db.stop_task_recurrence(task_id)
-                    continue
-            
-            # Calculate next due date based on pattern
-            last_generated = task['recurring'].get('last_generated', task.get('due_date'))
-            pattern = task['recurring']['pattern']
-            
-            next_due = None
-            
-            if pattern == 'daily':
-                next_due = last_generated + datetime.timedelta(days=1)
-            
-            elif pattern == 'weekly':
-                days_ahead = task['recurring'].get('day_of_week', 1) - last_generated.weekday()
-                if days_ahead <= 0:
-                    days_ahead += 7
-                next_due = last_generated + datetime.timedelta(days=days_ahead)
-            
-            elif pattern == 'monthly':
-                day_of_month = task['recurring'].get('day_of_month', 1)
-                next_month = last_generated.month + 1
-                next_year = last_generated.year
-                if next_month > 12:
-                    next_month = 1
-                    next_year += 1
-                next_due = datetime.datetime(next_year, next_month, min(day_of_month, 28))
-            
-            elif pattern == 'custom':
-                interval = task['recurring'].get('interval', 7)
-                next_due = last_generated + datetime.timedelta(days=interval)
-            
-            # Generate if due date has passed
-            if next_due and datetime.datetime.now() >= next_due:
-                new_task_id = db.generate_next_recurrence(task_id)
-                if new_task_id:
-                    generated_count += 1
-                    print(f"✓ Generated recurrence for task: {task['title']} (Due: {next_due.strftime('%Y-%m-%d')})")
-        
-        except Exception as e:
-            error_msg = f"Error processing task {task.get('title', 'Unknown')}: {str(e)}"
-            errors.append(error_msg)
-            print(f"✗ {error_msg}")
-    
+    # Spawned, not forked: MongoClient is not fork-safe, so each worker builds its own DB in process_shards
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(process_shards, run_id, lease_seconds) for _ in range(workers)]
+        for future in futures:
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                errors.append(str(e))
+                print(f"✗ Worker failed: {e}")
+
+    # A worker process that died outright breaks the whole pool; finish its shards here
+    if db.recurrence_wait_seconds(run_id) is not None:
+        print("Finishing outstanding shards in the parent process...")
+        results.extend(process_shards(run_id, lease_seconds))
+
+    elapsed = time.time() - started
+    generated = sum(r["generated"] for r in results)
+
     print(f"\n{'='*60}")
-    print(f"Recurring Task Generation Complete")
+    print(f"Recurring Task Generation Complete (run {run_id})")
     print(f"{'='*60}")
-    print(f"Total tasks processed: {len(recurring_tasks)}")
-    print(f"New instances generated: {generated_count}")
+    for r in sorted(results, key=lambda r: r["shard"]):
+        flag = " (lease lost)" if r["lost_lease"] else ""
+        print(f"  shard {r['shard']:>3}  attempt {r['attempt']}  series {r['series']:>6}  "
+              f"generated {r['generated']:>6}  skipped {r['duplicates']:>6}  {r['seconds']:.2f}s{flag}")
+    pending = [s["index"] for s in db.get_recurrence_run(run_id) if s["status"] != "done"]
+    print(f"Shards processed here: {len(results)}")
+    print(f"Shards not yet done: {len(pending)}")
+    print(f"New instances generated: {generated}")
     print(f"Errors: {len(errors)}")
-    
-    if errors:
-        print("\nError Details:")
-        for error in errors:
-            print(f"  - {error}")
-    
-    return generated_count
+    print(f"Elapsed: {elapsed:.2f}s")
+
+    return generated
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate recurring task instances")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--lease-seconds", type=int, default=120)
+    parser.add_argument("--run-id", default=None, help="Defaults to today's UTC date")
+    args = parser.parse_args()
+
     try:
-        count = generate_recurring_tasks()
+        count = generate_recurring_tasks(args.workers, args.shards, args.lease_seconds, args.run_id)
         sys.exit(0)
     except Exception as e:
         print(f"FATAL ERROR: {e}")
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Startup import profile for the Streamlit entry points
+Imports each page's module-level dependencies in a fresh interpreter under
+`python -X importtime`, and reports the cost on top of Streamlit itself.
+
+    python scripts/profile_startup.py                  # report
+    python scripts/profile_startup.py --budget-ms 150  # fail if a page imports slower
+    python scripts/profile_startup.py --strict         # fail if a page loads a heavy dependency
+
+Exit code is 1 when a check fails, so it can gate CI as a benchmark.
+"""
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages that should only load on first use, never at page import.
+# Matched as a package and its submodules; "google.auth" rather than "google", since
+# Streamlit itself loads google.protobuf.
+HEAVY_MODULES = ["bcrypt", "google.auth", "googleapiclient", "google_auth_oauthlib", "httplib2", "pandas", "plotly", "pyarrow"]
+
+BASELINE_IMPORTS = ["streamlit", "pymongo", "bson"]
+
+def entry_points():
+    """Home.py plus every page script"""
+    pages_dir = os.path.join(APP_ROOT, "pages")
+    pages = sorted(
+        os.path.join("pages", name) for name in os.listdir(pages_dir) if name.endswith(".py")
+    )
+    return ["Home.py"] + pages
+
+def module_imports(script):
+    """Modules imported at the top level of a script (nested/lazy imports are skipped on purpose)"""
+    with open(os.path.join(APP_ROOT, script), encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=script)
+
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        {module: (self_us, cumulative_us, depth)}
+    """
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # "import time:   self |   cumulative | <indent>package", two spaces per nesting level
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        timings[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return timings
+
+def profile_modules(modules):
+    """Import modules in a fresh interpreter. Returns parsed timings, or raises on import failure."""
+    code = "\n".join(f"import {m}" for m in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_ROOT,
+        env={**os.environ, "PYTHONPATH": APP_ROOT},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        last = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(last)
+    return parse_importtime(result.stderr)
+
+def heavy_modules(loaded, baseline=()):
+    """HEAVY_MODULES the entry point loads that the baseline (Streamlit itself) does not"""
+    def loads(names, package):
+        return any(name == package or name.startswith(package + ".") for name in names)
+    return sorted(m for m in HEAVY_MODULES if loads(loaded, m) and not loads(baseline, m))
+
+def total_ms(timings):
+    return sum(cum for _, cum, depth in timings.values() if depth == 0) / 1000
+
+def profile_entry(script, runs, ignore=(), baseline=()):
+    """Median import cost of one entry point, its slowest modules and any heavy dependencies it loads"""
+    modules = module_imports(script)
+    samples = []
+    timings = {}
+    for _ in range(runs):
+        timings = profile_modules(modules)
+        samples.append(total_ms(timings))
+
+    slowest = sorted(
+        ((name, cum / 1000) for name, (_, cum, _) in timings.items() if name not in ignore and name not in baseline and name.split(".")[0] not in BASELINE_IMPORTS),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:5]
+    return {
+        "entry": script,
+        "imports": modules,
+        "total_ms": statistics.median(samples),
+        "heavy": heavy_modules(timings, baseline),
+        "slowest": slowest,
+    }
+
+def profile_startup(runs=3, budget_ms=None, strict=False, json_path=None):
+    baseline_runs = [profile_modules(BASELINE_IMPORTS) for _ in range(runs)]
+    baseline = statistics.median(total_ms(timings) for timings in baseline_runs)
+    # Whatever Streamlit already pulls in (protobuf, sometimes pandas/pyarrow) is not the page's doing
+    baseline_modules = set().union(*baseline_runs)
+    # Modules the bare interpreter loads (site, encodings, ...) are not worth listing
+    interpreter = set(profile_modules([]))
+
+    results = []
+    failures = []
+    for script in entry_points():
+        try:
+            report = profile_entry(script, runs, ignore=interpreter, baseline=baseline_modules)
+        except RuntimeError as e:
+            failures.append(f"{script}: import failed ({e})")
+            continue
+        report["app_ms"] = max(0.0, report["total_ms"] - baseline)
+        results.append(report)
+
+        if budget_ms is not None and report["app_ms"] > budget_ms:
+            failures.append(f"{script}: {report['app_ms']:.1f}ms over budget of {budget_ms:.0f}ms")
+        if strict and report["heavy"]:
+            failures.append(f"{script}: loads {', '.join(report['heavy'])} at import")
+
+    print(f"\n{'='*60}")
+    print(f"Startup Import Profile ({runs} run(s), median)")
+    print(f"{'='*60}")
+    print(f"Baseline ({', '.join(BASELINE_IMPORTS)}): {baseline:.1f}ms")
+    for r in sorted(results, key=lambda item: item["app_ms"], reverse=True):
+        heavy = f"  heavy: {', '.join(r['heavy'])}" if r["heavy"] else ""
+        print(f"\n{r['entry']:<32} +{r['app_ms']:7.1f}ms{heavy}")
+        for name, ms in r["slowest"]:
+            print(f"    {ms:8.1f}ms  {name}")
+
+    if failures:
+        print(f"\n{'='*60}")
+        print("FAILED:")
+        for f in failures:
+            print(f"  {f}")
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"baseline_ms": baseline, "entries": results, "failures": failures}, f, indent=2)
+
+    return not failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile import time of the Streamlit entry points")
+    parser.add_argument("--runs", type=int, default=3, help="Interpreter launches per entry point (median is reported)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if an entry point adds more than this on top of Streamlit")
+    parser.add_argument("--strict", action="store_true", help="Fail if an entry point imports a heavy dependency")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    try:
+        ok = profile_startup(args.runs, args.budget_ms, args.strict, args.json_path)
+        sys.exit(0 if ok else 1)
+    except Exception as e:
+        print(f"FATAL ERROR: {e}")
+        sys.exit(1)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Backfill job for time tracking rollups
+Run once after deploying rollups, or whenever totals drift:
+    python scripts/rebuild_time_rollups.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import DreamShiftDB
+import time
+
+def rebuild_time_rollups():
+    """Recompute task, user and user-day rollups from time_entries"""
+    db = DreamShiftDB()
+
+    started = time.time()
+    written = db.rebuild_time_rollups()
+    elapsed = time.time() - started
+
+    print(f"\n{'='*60}")
+    print(f"Time Rollup Rebuild Complete")
+    print(f"{'='*60}")
+    print(f"Rollup documents written: {written}")
+    print(f"Elapsed: {elapsed:.2f}s")
+
+    return written
+
+if __name__ == "__main__":
+    try:
+        rebuild_time_rollups()
+        sys.exit(0)
+    except Exception as e:
+        print(f"FATAL ERROR: {e}")
+        sys.exit(1)
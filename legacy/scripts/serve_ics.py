@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+iCalendar feed server
+Runs next to Streamlit and serves subscription feeds:
+    GET /feeds/<token>.ics                  tasks assigned to the token's user
+    GET /feeds/<token>/<workspace_id>.ics   tasks in a workspace the user belongs to
+
+Run: python scripts/serve_ics.py --port 8502
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.database import DreamShiftDB
+from src.ics_feed import FeedCache, resolve_feed, feed_etag, iter_ics, CACHE_MAX_BYTES
+
+FEED_PATH = re.compile(r"^/feeds/([A-Za-z0-9_\-]+)(?:/([0-9a-f]{24}))?\.ics$")
+TOKEN_IN_LOG = re.compile(r"/feeds/[A-Za-z0-9_\-]+")
+
+db = None
+cache = FeedCache()
+
+class FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.0"  # Close-delimited body, so the feed can stream without a length
+
+    def do_GET(self):
+        match = FEED_PATH.match(self.path.split("?", 1)[0])
+        if not match:
+            return self.send_error(404)
+
+        resolved = resolve_feed(db, match.group(1), match.group(2))
+        if not resolved:
+            return self.send_error(404)
+        scope_key, query, name = resolved
+
+        count, latest = db.get_feed_state(query)
+        etag = feed_etag(scope_key, count, latest)
+
+        if etag in [t.strip() for t in (self.headers.get("If-None-Match") or "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        cached = cache.get(scope_key, etag)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/calendar; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "private, max-age=300")
+        if cached is not None:
+            self.send_header("Content-Length", str(len(cached)))
+            self.end_headers()
+            self.wfile.write(cached)
+            return
+        self.end_headers()
+
+        # Stream from the cursor, keeping a copy for the cache while it stays small
+        body = bytearray()
+        for chunk in iter_ics(db.iter_feed_tasks(query), name):
+            data = chunk.encode("utf-8")
+            self.wfile.write(data)
+            if body is not None:
+                body += data
+                if len(body) > CACHE_MAX_BYTES:
+                    body = None
+        if body is not None:
+            cache.put(scope_key, etag, bytes(body))
+
+    def log_message(self, fmt, *args):
+        # Feed tokens are secrets: keep them out of access logs
+        print(f"{self.address_string()} {TOKEN_IN_LOG.sub('/feeds/<token>', fmt % args)}")
+
+def serve(host, port):
+    global db
+    db = DreamShiftDB()
+    server = ThreadingHTTPServer((host, port), FeedHandler)
+    print(f"Serving calendar feeds on http://{host}:{port}/feeds/")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve iCalendar task feeds")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("ICS_PORT", 8502)))
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Cron job to sync Google Calendar for every connected user
+Run this every few minutes: */10 * * * * /path/to/python scripts/sync_google_calendar.py
+
+For each user with stored credentials, calendar-side edits are pulled first
+(moved or deleted events), then new, changed and removed tasks are pushed.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+from src.database import DreamShiftDB
+from src.calendar_sync import pull_gcal_changes, sync_all_tasks_to_gcal
+
+def sync_google_calendar(user_emails=None):
+    """Pull then push for the given users (default: everyone who connected a calendar)"""
+    db = DreamShiftDB()
+    if not user_emails:
+        user_emails = [doc["_id"] for doc in db.db.gcal_credentials.find({}, {"_id": 1})]
+
+    started = time.time()
+    pulled = pushed = 0
+    errors = []
+    for email in user_emails:
+        try:
+            pulled += pull_gcal_changes(db, email)
+            pushed += sync_all_tasks_to_gcal(db, email)
+        except Exception as e:
+            errors.append(email)
+            print(f"✗ Sync failed for {email}: {e}")
+    elapsed = time.time() - started
+
+    print(f"\n{'='*60}")
+    print(f"Google Calendar Sync Complete")
+    print(f"{'='*60}")
+    print(f"Users: {len(user_emails)}")
+    print(f"Tasks updated from calendar edits: {pulled}")
+    print(f"Events inserted, patched or deleted: {pushed}")
+    print(f"Errors: {len(errors)}")
+    print(f"Elapsed: {elapsed:.2f}s")
+
+    return pushed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync tasks with connected Google Calendars")
+    parser.add_argument("--user", action="append", dest="users", help="Only this user (repeatable)")
+    args = parser.parse_args()
+
+    try:
+        sync_google_calendar(args.users)
+        sys.exit(0)
+    except Exception as e:
+        print(f"FATAL ERROR: {e}")
+        sys.exit(1)
@@ -0,0 +1,77 @@
+"""
+Async data layer for DreamShift EMS
+AsyncDreamShiftDB exposes every DreamShiftDB method as a coroutine. Calls run on a
+bounded thread pool over the shared pymongo client (which is thread-safe and
+pooled), so independent reads overlap instead of waiting on each other's round trip.
+load_bundle does the same for plain callables from synchronous code, which is what
+Streamlit pages are: a page's independent reads go out together and the page waits
+roughly as long as the slowest one.
+"""
+
+import asyncio
+import functools
+import inspect
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.database import DreamShiftDB
+
+# Concurrent queries per process (pymongo's own pool defaults to 100 connections)
+DB_WORKERS = int(os.getenv("DB_WORKERS", "16"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _executor():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="db")
+    return _pool
+
+def load_bundle(**loaders):
+    """
+    Run a page's independent reads concurrently and return {name: result}:
+    `data = load_bundle(stats=lambda: db.get_user_stats(email), notifs=...)`.
+    The first exception is raised once all have finished.
+    Loaders run off the script thread, so they should only query (no st.* calls,
+    no session state) and must not call load_bundle themselves.
+    """
+    futures = {name: _executor().submit(fn) for name, fn in loaders.items()}
+    results = {}
+    error = None
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            error = error or e
+    if error:
+        raise error
+    return results
+
+class AsyncDreamShiftDB:
+    """
+    Awaitable counterpart of DreamShiftDB with the same method surface:
+    `await adb.get_user_stats(email)`. Non-method attributes (db, client) pass through.
+    """
+
+    def __init__(self, db=None):
+        self.sync = db or DreamShiftDB()
+
+    def __getattr__(self, name):
+        attr = getattr(self.sync, name)
+        if name.startswith("_") or not inspect.isroutine(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_executor(), functools.partial(attr, *args, **kwargs))
+        return call
+
+    async def gather(self, **calls):
+        """Await named coroutines together: `await adb.gather(stats=adb.get_user_stats(e), ...)`"""
+        values = await asyncio.gather(*calls.values())
+        return dict(zip(calls.keys(), values))
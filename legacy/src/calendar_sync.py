@@ -5,102 +5,433 @@ Handles OAuth 2.0 flow and task synchronization with Google Calendar
 
 import os
 import datetime
-import pickle
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pymongo import UpdateOne
 
-# If modifying these scopes, delete the file token.pickle.
+# The Google client libraries take a large share of cold start, so they are
+# imported inside the functions that talk to Google rather than at module load.
+
+# If modifying these scopes, users must re-authorize (stored credentials are per scope set).
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
-def authorize_gcal():
+# Google accepts up to 1000 calls per batch but recommends staying around 50
+BATCH_SIZE = 50
+TASK_PROPERTY = "dreamshift_task_id"
+
+# Refresh access tokens this long before they expire, instead of on a failed call
+REFRESH_MARGIN = datetime.timedelta(minutes=5)
+SERVICE_CACHE_SIZE = 128
+
+# ==========================================
+# PER-USER CREDENTIAL STORE (MongoDB: gcal_credentials)
+# ==========================================
+
+def load_user_credentials(db, user_email):
+    from google.oauth2.credentials import Credentials
+    doc = db.db.gcal_credentials.find_one({"_id": user_email})
+    if not doc:
+        return None
+    return Credentials(
+        token=doc.get("token"),
+        refresh_token=doc.get("refresh_token"),
+        token_uri=doc.get("token_uri"),
+        client_id=doc.get("client_id"),
+        client_secret=doc.get("client_secret"),
+        scopes=doc.get("scopes"),
+        expiry=doc.get("expiry"),
+    )
+
+def save_user_credentials(db, user_email, creds):
+    db.db.gcal_credentials.update_one(
+        {"_id": user_email},
+        {"$set": {
+            "token": creds.token,
+            "refresh_token": creds.refresh_token,
+            "token_uri": creds.token_uri,
+            "client_id": creds.client_id,
+            "client_secret": creds.client_secret,
+            "scopes": list(creds.scopes or SCOPES),
+            "expiry": creds.expiry,
+            "updated_at": datetime.datetime.utcnow(),
+        }},
+        upsert=True
+    )
+
+def delete_user_credentials(db, user_email):
+    db.db.gcal_credentials.delete_one({"_id": user_email})
+    _service_cache.evict(user_email)
+
+def _needs_refresh(creds):
+    if not creds.token:
+        return True
+    if not creds.expiry:
+        return False
+    return creds.expiry - datetime.datetime.utcnow() < REFRESH_MARGIN
+
+def authorize_gcal(db, user_email):
     """
-    Handles Google Calendar OAuth2 authorization.
+    Handles Google Calendar OAuth2 authorization for one user.
+    Credentials are stored per user in MongoDB and refreshed proactively.
     Returns: google.oauth2.credentials.Credentials object or None
     """
-    creds = None
-    # The file token.pickle stores the user's access and refresh tokens
-    if os.path.exists('token.pickle'):
-        with open('token.pickle', 'rb') as token:
-            try:
-                creds = pickle.load(token)
-            except Exception:
-                creds = None
-                
-    # If there are no (valid) credentials available, let the user log in.
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception:
-                creds = None
-
-        if not creds:
-            # Check if credentials.json exists
-            if not os.path.exists('credentials.json'):
-                # Return None if no credentials file found
-                # (Caller should handle the "missing credentials.json" error)
-                return None
-                
-            try:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    'credentials.json', SCOPES)
-                creds = flow.run_local_server(port=0)
-            except Exception as e:
-                print(f"Authorization failed: {e}")
-                return None
-
-        # Save the credentials for the next run
-        with open('token.pickle', 'wb') as token:
-            pickle.dump(creds, token)
+    from google.auth.transport.requests import Request
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
+    creds = load_user_credentials(db, user_email)
+
+    if creds and _needs_refresh(creds) and creds.refresh_token:
+        try:
+            creds.refresh(Request())
+            save_user_credentials(db, user_email, creds)
+        except Exception:
+            creds = None
+
+    if not creds:
+        # Check if credentials.json exists
+        if not os.path.exists('credentials.json'):
+            # Return None if no credentials file found
+            # (Caller should handle the "missing credentials.json" error)
+            return None
+
+        try:
+            flow = InstalledAppFlow.from_client_secrets_file(
+                'credentials.json', SCOPES)
+            creds = flow.run_local_server(port=0)
+        except Exception as e:
+            print(f"Authorization failed: {e}")
+            return None
+
+        save_user_credentials(db, user_email, creds)
+        _service_cache.evict(user_email)
 
     return creds
 
-def sync_all_tasks_to_gcal(db, user_email, creds):
+# ==========================================
+# CALENDAR SERVICE CACHE (per process, keyed by user)
+# ==========================================
+
+class _ServiceCache:
+    """Small thread-safe LRU of built Calendar services, so discovery runs once per user."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._refresh_locks = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, creds, service):
+        with self._lock:
+            self._entries[key] = (creds, service)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._refresh_locks.pop(evicted, None)
+
+    def evict(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def refresh_lock(self, key):
+        with self._lock:
+            return self._refresh_locks.setdefault(key, threading.Lock())
+
+_service_cache = _ServiceCache(SERVICE_CACHE_SIZE)
+
+def _build_service(creds):
+    import httplib2
+    import google_auth_httplib2
+    from googleapiclient.discovery import build
+    from googleapiclient.http import HttpRequest
+
+    # httplib2 is not thread-safe: give every request its own Http, sharing the credentials
+    def request_builder(http, *args, **kwargs):
+        return HttpRequest(google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http()), *args, **kwargs)
+
+    authed_http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+    return build('calendar', 'v3', http=authed_http, requestBuilder=request_builder,
+                 cache_discovery=False, static_discovery=True)
+
+def _adopt_token(target, source):
+    """Copy a newer access token onto the credentials a cached service already holds"""
+    if source.token and source.token != target.token:
+        target.token = source.token
+        target.expiry = source.expiry
+
+def get_calendar_service(db, user_email, creds=None):
     """
-    Syncs all active tasks for the user to their Google Calendar.
-    Returns: Number of tasks synced (int)
+    Returns a cached Calendar service for the user, or None if they have not authorized.
+    The cache is keyed by user only: credentials passed in (often rebuilt per call)
+    update the cached credentials in place instead of rebuilding the service.
+    Credentials come from the store on first use and are refreshed ahead of expiry.
     """
-    if not creds:
+    from google.auth.transport.requests import Request
+
+    entry = _service_cache.get(user_email)
+    if entry:
+        cached_creds, service = entry
+        if creds is not None and creds is not cached_creds:
+            _adopt_token(cached_creds, creds)
+    else:
+        cached_creds = creds or load_user_credentials(db, user_email)
+        if not cached_creds:
+            return None
+        service = _build_service(cached_creds)
+        _service_cache.put(user_email, cached_creds, service)
+
+    if _needs_refresh(cached_creds) and cached_creds.refresh_token:
+        with _service_cache.refresh_lock(user_email):
+            if _needs_refresh(cached_creds):
+                try:
+                    cached_creds.refresh(Request())
+                    save_user_credentials(db, user_email, cached_creds)
+                except Exception as e:
+                    print(f"Token refresh failed for {user_email}: {e}")
+    return service
+
+def event_id_for_task(task_id):
+    """Deterministic event ID (base32hex-safe) so a retried insert can never duplicate."""
+    return f"ds{task_id}"
+
+def build_event_body(task):
+    """Google Calendar event for a task."""
+    return {
+        'summary': f"DreamShift: {task['title']}",
+        'description': f"Project: {task.get('project_name', 'N/A')}\nPriority: {task.get('priority', 'Medium')}",
+        'start': {
+            'dateTime': task['due_date'].isoformat(),
+            'timeZone': 'UTC',  # Adjust as needed
+        },
+        'end': {
+            'dateTime': (task['due_date'] + datetime.timedelta(hours=1)).isoformat(),
+            'timeZone': 'UTC',
+        },
+        'extendedProperties': {'private': {TASK_PROPERTY: str(task['_id'])}},
+        # Event IDs are fixed per task, so a reopened task patches its own deleted event back to life
+        'status': 'confirmed',
+    }
+
+def content_hash(body):
+    """Stable hash of an event body, stored on the task to detect changes."""
+    return hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def plan_gcal_sync(tasks, user_email):
+    """
+    Diff tasks against what was last pushed.
+    Returns a list of (action, task, body) with action in insert / patch / delete.
+    """
+    plan = []
+    for task in tasks:
+        if task.get('gcal_owner') not in (None, user_email):
+            # Still on the previous assignee's calendar; their next sync releases it
+            continue
+        event_id = task.get('gcal_event_id')
+        wanted = (
+            task.get('assignee') == user_email
+            and task.get('status') != 'Completed'
+            and task.get('due_date')
+            and not task.get('gcal_detached')
+        )
+        if not wanted:
+            if event_id:
+                plan.append(('delete', task, None))
+            continue
+
+        body = build_event_body(task)
+        if not event_id:
+            plan.append(('insert', task, body))
+        elif task.get('gcal_hash') != content_hash(body):
+            plan.append(('patch', task, body))
+    return plan
+
+def _status_of(exception):
+    return getattr(getattr(exception, 'resp', None), 'status', None)
+
+def _execute_batches(service, plan):
+    """Runs the plan through BatchHttpRequest. Returns {task_id: (response, exception)}."""
+    results = {}
+    events = service.events()
+
+    for start in range(0, len(plan), BATCH_SIZE):
+        batch = service.new_batch_http_request(
+            callback=lambda request_id, response, exception: results.__setitem__(request_id, (response, exception))
+        )
+        for action, task, body in plan[start:start + BATCH_SIZE]:
+            tid = str(task['_id'])
+            if action == 'insert':
+                request = events.insert(calendarId='primary', body=dict(body, id=event_id_for_task(tid)))
+            elif action == 'patch':
+                request = events.patch(calendarId='primary', eventId=task['gcal_event_id'], body=body)
+            else:
+                request = events.delete(calendarId='primary', eventId=task['gcal_event_id'])
+            batch.add(request, request_id=tid)
+        batch.execute()
+
+    return results
+
+def sync_all_tasks_to_gcal(db, user_email, creds=None):
+    """
+    Incrementally syncs the user's tasks to their Google Calendar.
+    Only new, changed and removed tasks produce calls, grouped into batched HTTP requests.
+    Returns: Number of events inserted, patched or deleted (int)
+    """
+    service = get_calendar_service(db, user_email, creds)
+    if not service:
         return 0
 
     try:
-        service = build('calendar', 'v3', credentials=creds)
-        
-        # 1. Fetch active tasks for the user
-        tasks = db.get_tasks_with_urgency({"assignee": user_email, "status": {"$ne": "Completed"}})
-        
+
+        # 1. Tasks assigned to the user, plus anything previously pushed to their calendar
+        tasks = list(db.db.tasks.find(
+            {"$or": [{"assignee": user_email, "status": {"$ne": "Completed"}}, {"gcal_owner": user_email}]},
+            {"title": 1, "priority": 1, "project_name": 1, "due_date": 1, "status": 1, "assignee": 1,
+             "gcal_event_id": 1, "gcal_hash": 1, "gcal_owner": 1, "gcal_detached": 1}
+        ))
+        plan = plan_gcal_sync(tasks, user_email)
+        if not plan:
+            return 0
+
+        # 2. Push the diff in batches
+        results = _execute_batches(service, plan)
+
+        # 3. Retry conflicting inserts (event left by an interrupted run, or deleted
+        #    when the task was completed or reassigned) as patches; the body restores it
+        conflicts = [
+            ('patch', dict(task, gcal_event_id=event_id_for_task(task['_id'])), body)
+            for action, task, body in plan
+            if action == 'insert' and _status_of(results.get(str(task['_id']), (None, None))[1]) == 409
+        ]
+        if conflicts:
+            results.update(_execute_batches(service, conflicts))
+            retried = {str(t['_id']): (a, t, b) for a, t, b in conflicts}
+            plan = [retried.get(str(t['_id']), (a, t, b)) for a, t, b in plan]
+
+        # 4. Record event IDs and hashes for what succeeded
         count = 0
-        for task in tasks:
-            if not task.get('due_date'):
+        updates = []
+        for action, task, body in plan:
+            response, exception = results.get(str(task['_id']), (None, None))
+            status = _status_of(exception)
+            if exception and not (action == 'delete' and status in (404, 410)):
+                print(f"Failed to sync task {task.get('title')}: {exception}")
                 continue
+            if action == 'delete':
+                updates.append(UpdateOne({"_id": task['_id']}, {"$unset": {"gcal_event_id": "", "gcal_hash": "", "gcal_owner": ""}}))
+            else:
+                updates.append(UpdateOne({"_id": task['_id']}, {"$set": {
+                    "gcal_event_id": (response or {}).get('id') or task.get('gcal_event_id') or event_id_for_task(task['_id']),
+                    "gcal_hash": content_hash(body),
+                    "gcal_owner": user_email,
+                }}))
+            count += 1
 
-            # Check if already synced (you might want to store gcal_event_id in db to avoid dupes)
-            # For simplicity, this example just adds events. 
-            # In production, check task.get('gcal_event_id') first.
-
-            event_body = {
-                'summary': f"DreamShift: {task['title']}",
-                'description': f"Project: {task.get('project_name', 'N/A')}\nPriority: {task.get('priority', 'Medium')}",
-                'start': {
-                    'dateTime': task['due_date'].isoformat(),
-                    'timeZone': 'UTC',  # Adjust as needed
-                },
-                'end': {
-                    'dateTime': (task['due_date'] + datetime.timedelta(hours=1)).isoformat(),
-                    'timeZone': 'UTC',
-                },
-            }
-
-            try:
-                service.events().insert(calendarId='primary', body=event_body).execute()
-                count += 1
-            except Exception as e:
-                print(f"Failed to sync task {task['title']}: {e}")
-                
+        if updates:
+            db.db.tasks.bulk_write(updates, ordered=False)
         return count
 
     except Exception as e:
         print(f"Sync failed: {e}")
         return 0
+
+def _event_due_date(event):
+    start = event.get('start') or {}
+    if start.get('dateTime'):
+        due = datetime.datetime.fromisoformat(start['dateTime'].replace('Z', '+00:00'))
+        if due.tzinfo:
+            due = due.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return due
+    if start.get('date'):
+        return datetime.datetime.fromisoformat(start['date'])
+    return None
+
+def pull_gcal_changes(db, user_email, creds=None):
+    """
+    Applies calendar-side edits back to tasks using Google sync tokens.
+    Moving an event moves the task's due date; deleting it detaches the task from sync.
+    Returns: Number of tasks updated (int)
+    """
+    from googleapiclient.errors import HttpError
+
+    service = get_calendar_service(db, user_email, creds)
+    if not service:
+        return 0
+
+    user = db.db.users.find_one({"email": user_email}, {"gcal_sync_token": 1}) or {}
+    sync_token = user.get('gcal_sync_token')
+
+    changed = []
+    page_token = None
+    next_sync_token = None
+    while True:
+        params = {'calendarId': 'primary', 'showDeleted': True, 'maxResults': 250, 'pageToken': page_token}
+        if sync_token:
+            params['syncToken'] = sync_token
+        try:
+            page = service.events().list(**params).execute()
+        except HttpError as e:
+            if _status_of(e) == 410 and sync_token:
+                # Token expired: fall back to a full resync
+                sync_token = None
+                page_token = None
+                changed = []
+                continue
+            raise
+        changed.extend(
+            e for e in page.get('items', [])
+            if (e.get('extendedProperties') or {}).get('private', {}).get(TASK_PROPERTY)
+        )
+        page_token = page.get('nextPageToken')
+        if not page_token:
+            next_sync_token = page.get('nextSyncToken')
+            break
+
+    updates = []
+    moved = []
+    for event in changed:
+        task_id = event['extendedProperties']['private'][TASK_PROPERTY]
+        try:
+            oid = db.ObjectId(task_id)
+        except Exception:
+            continue
+        if event.get('status') == 'cancelled':
+            updates.append(UpdateOne(
+                {"_id": oid, "gcal_owner": user_email},
+                {"$set": {"gcal_detached": True}, "$unset": {"gcal_event_id": "", "gcal_hash": "", "gcal_owner": ""}}
+            ))
+            continue
+        due = _event_due_date(event)
+        if due:
+            moved.append(oid)
+            updates.append(UpdateOne(
+                {"_id": oid, "gcal_owner": user_email, "due_date": {"$ne": due}},
+                {"$set": {"due_date": due, "updated_at": datetime.datetime.utcnow()}}
+            ))
+
+    modified = db.db.tasks.bulk_write(updates, ordered=False).modified_count if updates else 0
+
+    # Re-hash moved tasks so the next push does not echo the same change back
+    if modified and moved:
+        moved_tasks = list(db.db.tasks.find({"_id": {"$in": moved}, "gcal_owner": user_email},
+                                            {"title": 1, "priority": 1, "project_name": 1, "due_date": 1, "workspace_id": 1}))
+        rehash = [
+            UpdateOne({"_id": t['_id']}, {"$set": {"gcal_hash": content_hash(build_event_body(t))}})
+            for t in moved_tasks
+            if t.get('due_date')
+        ]
+        if rehash:
+            db.db.tasks.bulk_write(rehash, ordered=False)
+        for ws_id in {t.get('workspace_id') for t in moved_tasks}:
+            db.invalidate_workspace(ws_id)
+
+    if next_sync_token:
+        db.db.users.update_one({"email": user_email}, {"$set": {"gcal_sync_token": next_sync_token}})
+    return modified
@@ -0,0 +1,161 @@
+"""
+Change feed for DreamShift EMS
+One background thread per process follows a MongoDB change stream on tasks,
+comments, notifications, workspaces, projects and task templates. Each change:
+  - retires the affected workspace's cached reads (DreamShiftDB query cache), and
+  - bumps in-memory topic counters ("tasks:<ws>", "comments:<type>:<id>", "inbox:<email>")
+    that live fragments poll, so open sessions refresh just the fragment that changed.
+
+Change streams need a replica set (a single-node one is enough). Enable with
+LIVE_UPDATES=1; without it, or if the stream fails, caches fall back to their short TTL.
+"""
+
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from pymongo.errors import OperationFailure
+
+LIVE_UPDATES = os.getenv("LIVE_UPDATES", "0") == "1"
+# How often live fragments check their topics (an in-memory comparison, no query)
+LIVE_REFRESH = os.getenv("LIVE_REFRESH", "5s")
+# Query cache TTL while the feed is healthy (invalidation is event-driven then)
+LIVE_CACHE_TTL = int(os.getenv("LIVE_CACHE_TTL", "900"))
+
+WATCHED = ["tasks", "comments", "notifications", "workspaces", "projects", "task_templates"]
+RETRY_DELAY = 5
+# Topics remembered per process (least recently published are dropped first)
+TOPIC_LIMIT = 10000
+# ChangeStreamFatalError / ChangeStreamHistoryLost: the resume token is no longer usable
+UNRESUMABLE_CODES = {280, 286}
+
+class ChangeFeed:
+    """Consumes the change stream and publishes topic versions"""
+
+    def __init__(self, db):
+        self.db = db
+        self.healthy = False
+        self._versions = OrderedDict()
+        # One sequence for all topics: a dropped topic that comes back never repeats an old version
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self._resume_token = None
+        self._thread = threading.Thread(target=self._run, name="ds-change-feed", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    # --- topics ---
+
+    def publish(self, topic):
+        with self._lock:
+            self._versions[topic] = next(self._seq)
+            self._versions.move_to_end(topic)
+            while len(self._versions) > TOPIC_LIMIT:
+                self._versions.popitem(last=False)
+
+    def versions(self, topics):
+        with self._lock:
+            return tuple(self._versions.get(t, 0) for t in topics)
+
+    # --- stream ---
+
+    def _pipeline(self):
+        return [
+            {"$match": {"ns.coll": {"$in": WATCHED}}},
+            # Only what routing needs; the looked-up document would otherwise ride along in full
+            {"$project": {
+                "operationType": 1, "ns": 1, "documentKey": 1,
+                "fullDocument.workspace_id": 1, "fullDocument.user_email": 1,
+                "fullDocument.entity_type": 1, "fullDocument.entity_id": 1,
+            }},
+        ]
+
+    def _run(self):
+        while True:
+            try:
+                with self.db.db.watch(
+                    self._pipeline(), full_document="updateLookup", resume_after=self._resume_token
+                ) as stream:
+                    self._set_healthy(True)
+                    for change in stream:
+                        self._resume_token = stream.resume_token
+                        self.handle(change)
+            except Exception as e:
+                print(f"Change feed interrupted: {e}")
+                if isinstance(e, OperationFailure) and e.code in UNRESUMABLE_CODES:
+                    self._resume_token = None
+                # Anything could have changed while we were not listening
+                self._set_healthy(False)
+                time.sleep(RETRY_DELAY)
+
+    def _set_healthy(self, healthy):
+        if healthy == self.healthy:
+            return
+        self.healthy = healthy
+        from src.database import QUERY_CACHE_TTL
+        self.db.invalidate_all()
+        self.db.set_query_cache_ttl(LIVE_CACHE_TTL if healthy else QUERY_CACHE_TTL)
+
+    def handle(self, change):
+        """Route one change event to cache invalidation and topic bumps"""
+        coll = change.get("ns", {}).get("coll")
+        doc = change.get("fullDocument") or {}
+        doc_id = str((change.get("documentKey") or {}).get("_id"))
+
+        if coll == "tasks":
+            ws_id = doc.get("workspace_id")
+            if ws_id:
+                self.db.invalidate_workspace(ws_id)
+                self.publish(f"tasks:{ws_id}")
+            else:
+                # Deletes carry no document, so the workspace is unknown
+                self.db.invalidate_all()
+                self.publish("tasks")
+        elif coll in ("projects", "task_templates"):
+            # Cached per workspace (get_workspace_projects, get_task_templates); no live fragment reads them
+            ws_id = doc.get("workspace_id")
+            if ws_id:
+                self.db.invalidate_workspace(ws_id)
+            else:
+                self.db.invalidate_all()
+        elif coll == "workspaces":
+            self.db.invalidate_workspace(doc_id)
+            self.publish(f"tasks:{doc_id}")
+        elif coll == "comments":
+            if doc.get("entity_type"):
+                self.publish(f"comments:{doc['entity_type']}:{doc.get('entity_id')}")
+            else:
+                self.publish("comments")
+        elif coll == "notifications":
+            if doc.get("user_email"):
+                self.publish(f"inbox:{doc['user_email']}")
+            else:
+                self.publish("inbox")
+
+_feed = None
+_feed_pid = None
+_feed_lock = threading.Lock()
+
+def start_change_feed(db):
+    """
+    Start this process's feed once (no-op unless LIVE_UPDATES=1). Called by the app's
+    pages, not by DreamShiftDB, so scripts that fork workers never start one. A forked
+    child inherits _feed but not its thread, so the feed is restarted per pid.
+    """
+    global _feed, _feed_pid
+    if not LIVE_UPDATES:
+        return None
+    if _feed is not None and _feed_pid == os.getpid():
+        return _feed
+    with _feed_lock:
+        if _feed is None or _feed_pid != os.getpid():
+            _feed = ChangeFeed(db).start()
+            _feed_pid = os.getpid()
+    return _feed
+
+def get_change_feed():
+    """This process's running feed, or None"""
+    return _feed if _feed_pid == os.getpid() else None
@@ -4,6 +4,10 @@ import html
 import re
 import streamlit as st
 from bson import ObjectId
+from src.ui import rerun_fragment, live_data, LIVE_RUN_EVERY
+from src.mentions import get_member_directory
+
+MENTION_RESULTS = 6
 
 REACTION_ORDER = ["thumbs_up", "heart", "party", "eyes", "check"]
 REACTION_ICONS = {
@@ -225,7 +229,7 @@ def render_comment(
             if st.button("↩︎", key=f"reply_{cid}", disabled=is_deleted, help="Reply", type="secondary"):
                 st.session_state.reply_to_comment_id = cid
                 st.session_state.edit_comment_id = None
-                st.rerun()
+                rerun_fragment()
 
         with a2:
             if can_pin:
@@ -233,7 +237,7 @@ def render_comment(
                 pin_help = "Unpin" if is_pinned else "Pin"
                 if st.button(pin_icon, key=f"pin_{cid}", help=pin_help, type="secondary"):
                     db.toggle_pin_comment(cid, current_user_email, (not is_pinned))
-                    st.rerun()
+                    rerun_fragment()
 
         with a3:
             # One reaction button -> popover menu (closest to ClickUp possible in Streamlit)
@@ -250,7 +254,7 @@ def render_comment(
                     with col:
                         if st.button(label, key=f"react_{cid}_{emoji}", type="secondary"):
                             db.toggle_reaction(cid, emoji, current_user_email)
-                            st.rerun()
+                            rerun_fragment()
 
         with a4:
             # Edit (only author + not deleted)
@@ -258,7 +262,7 @@ def render_comment(
                 if st.button("✏️", key=f"edit_{cid}", help="Edit", type="secondary"):
                     st.session_state.edit_comment_id = cid
                     st.session_state.reply_to_comment_id = None
-                    st.rerun()
+                    rerun_fragment()
 
         with a5:
             # Delete / Restore / Admin delete on right (keep compact)
@@ -270,19 +274,19 @@ def render_comment(
                         db.delete_comment(cid, current_user_email)
                         st.session_state.edit_comment_id = None
                         st.session_state.reply_to_comment_id = None
-                        st.rerun()
+                        rerun_fragment()
 
             if can_restore:
                 with right[1]:
                     if st.button("♻️", key=f"restore_{cid}", help="Restore", type="secondary"):
                         db.restore_comment(cid, current_user_email)
-                        st.rerun()
+                        rerun_fragment()
 
             if is_admin and not is_author:
                 with right[2]:
                     if st.button("🔨", key=f"admin_del_{cid}", help="Admin delete", type="secondary"):
                         db.delete_comment(cid, current_user_email, is_admin_action=True)
-                        st.rerun()
+                        rerun_fragment()
 
     # Inline edit
     if st.session_state.get("edit_comment_id") == cid and is_author and not is_deleted:
@@ -293,12 +297,12 @@ def render_comment(
             cancel = b2.form_submit_button("Cancel", use_container_width=True, type="secondary")
             if cancel:
                 st.session_state.edit_comment_id = None
-                st.rerun()
+                rerun_fragment()
             if save:
                 if new_text.strip():
                     db.edit_comment(cid, current_user_email, new_text.strip())
                     st.session_state.edit_comment_id = None
-                    st.rerun()
+                    rerun_fragment()
                 else:
                     st.error("Comment cannot be empty.")
 
@@ -311,7 +315,7 @@ def render_comment(
             cancel = b2.form_submit_button("Cancel", use_container_width=True, type="secondary")
             if cancel:
                 st.session_state.reply_to_comment_id = None
-                st.rerun()
+                rerun_fragment()
             if send:
                 if reply_text.strip():
                     db.add_comment(
@@ -325,15 +329,27 @@ def render_comment(
                         parent_comment_id=cid
                     )
                     st.session_state.reply_to_comment_id = None
-                    st.rerun()
+                    rerun_fragment()
                 else:
                     st.error("Reply cannot be empty.")
 
 
+def _recent_contacts(db, user_email):
+    """Who this user mentioned lately, loaded once per session (ranks the mention picker)"""
+    cached = st.session_state.get("_recent_contacts")
+    if not cached or cached[0] != user_email:
+        cached = (user_email, db.get_recent_contacts(user_email))
+        st.session_state._recent_contacts = cached
+    return cached[1]
+
+
+@st.fragment(run_every=LIVE_RUN_EVERY)
 def render_chat_interface(context_id, context_type="task"):
     """
     Unified chat/comment section for tasks and projects.
     Includes mention picker and uses the same thread UI for both.
+    Runs as a fragment: posting, replying, reacting or pinning reruns only the thread,
+    and other people's comments arrive live when the change feed is on.
     """
     from src.database import DreamShiftDB
     db = DreamShiftDB()
@@ -359,19 +375,37 @@ def render_chat_interface(context_id, context_type="task"):
     st.markdown("---")
     st.markdown("### Comments")
 
-    # Mention picker
-    members = db.get_workspace_members(workspace_id) if workspace_id else []
-    mention_options = [m.get("name") or m.get("email") for m in members if m.get("name") or m.get("email")]
+    # Mention picker: type-ahead over the workspace's prefix index, so only the top matches are sent
     mention_key = f"mention_pick_{context_type}_{context_id}"
+    picked = st.session_state.setdefault(mention_key, [])
 
-    if mention_options:
-        st.multiselect(
+    if workspace_id:
+        query = st.text_input(
             "Mention teammates",
-            options=mention_options,
-            key=mention_key,
+            key=f"mention_q_{context_type}_{context_id}",
             label_visibility="collapsed",
-            placeholder="Mention teammates…",
+            placeholder="Mention teammates… type a name or email",
         )
+        directory = get_member_directory(db, workspace_id)
+        matches = directory.search(
+            query,
+            k=MENTION_RESULTS,
+            recent=_recent_contacts(db, user_email),
+            exclude=[user_email] + [p["email"] for p in picked],
+        )
+        if matches:
+            cols = st.columns(len(matches))
+            for col, m in zip(cols, matches):
+                label = m.get("name") or m.get("email")
+                if col.button(f"@{label}", key=f"mention_add_{context_type}_{context_id}_{m['email']}", use_container_width=True):
+                    picked.append({"label": label, "email": m["email"]})
+                    rerun_fragment()
+        if picked:
+            c_list, c_clear = st.columns([0.85, 0.15])
+            c_list.caption("Mentioning: " + ", ".join(f"@{p['label']}" for p in picked))
+            if c_clear.button("Clear", key=f"mention_clear_{context_type}_{context_id}", use_container_width=True):
+                st.session_state[mention_key] = []
+                rerun_fragment()
 
     # New comment input
     text_key = f"comment_text_{context_type}_{context_id}"
@@ -388,8 +422,8 @@ def render_chat_interface(context_id, context_type="task"):
         if submitted:
             text = (new_comment or "").strip()
             selected_mentions = st.session_state.get(mention_key, []) or []
-            for name in selected_mentions:
-                tag = f"@{name}"
+            for p in selected_mentions:
+                tag = f"@{p['label']}"
                 if tag.lower() not in text.lower():
                     text = (text + " " + tag).strip()
 
@@ -405,10 +439,13 @@ def render_chat_interface(context_id, context_type="task"):
                 )
                 st.session_state[text_key] = ""
                 st.session_state[mention_key] = []
-                st.rerun()
+                # Mentions just changed the ranking
+                st.session_state.pop("_recent_contacts", None)
+                rerun_fragment()
 
     # Comments feed (threaded)
-    comments = db.get_comments(context_type, context_id)
+    topic = f"comments:{context_type}:{context_id}"
+    comments = live_data(topic, (topic, "comments"), lambda: db.get_comments(context_type, context_id))
     if not comments:
         st.markdown(
             """
@@ -2,10 +2,20 @@ import os
 import datetime
 import secrets
 import re
-from pymongo import MongoClient
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+from pymongo import MongoClient, ASCENDING, UpdateOne, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from bson.objectid import ObjectId
-import bcrypt
-from src.mailer import send_task_assignment_email, send_password_reset_email, send_mention_email
+
+from src.passwords import hash_password, verify_password
+from src.records import RAW_CODEC, TaskRecord, CommentRecord, NotificationRecord
+
+# dateutil and src.mailer are imported where they are used: most page
+# loads never send mail or expand a recurrence (bcrypt loads on first hash).
 
 def _load_streamlit_secrets_to_env():
     try:
@@ -21,6 +31,164 @@ def _load_streamlit_secrets_to_env():
     except Exception:
         return
 
+# Databases whose indexes were already ensured by this process
+_INDEXED_DBS = set()
+
+# One MongoClient (and connection pool) per URI and process; every DreamShiftDB()
+# on every rerun shares it instead of reconnecting. Keyed by pid because
+# MongoClient is not fork-safe: a forked child builds its own.
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def _get_client(uri):
+    key = (os.getpid(), uri)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+            # Trigger a connection check
+            client.admin.command('ping')
+            _CLIENTS[key] = client
+        return client
+
+# Read-through cache of user profiles (name, role, preferences)
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+
+class _UserCache:
+    """
+    Small thread-safe LRU of user profiles, shared by all sessions in the process.
+    Profile writes through DreamShiftDB replace their entry; the TTL bounds
+    staleness for changes made by other processes.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, email):
+        with self._lock:
+            entry = self._entries.get(email)
+            if not entry:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[email]
+                return None
+            self._entries.move_to_end(email)
+            return entry[1]
+
+    def put(self, email, profile):
+        with self._lock:
+            self._entries[email] = (time.monotonic(), profile)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def evict(self, email):
+        with self._lock:
+            self._entries.pop(email, None)
+
+_user_cache = _UserCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+# Per-workspace query result cache
+QUERY_CACHE_SIZE = 4096
+QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", "30"))
+
+class _QueryCache:
+    """
+    Thread-safe LRU of read results keyed by (workspace, query), shared by all sessions.
+    Every workspace has a version counter; writes bump it, which retires all of that
+    workspace's entries at once (they fail the version check and age out of the LRU).
+    The TTL bounds staleness for writes made by other processes. clear() bumps a global
+    epoch that is part of every version, so it retires all workspaces the same way.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def _current(self, workspace_id):
+        return (self._epoch, self._versions.get(workspace_id, 0))
+
+    def version(self, workspace_id):
+        with self._lock:
+            return self._current(workspace_id)
+
+    def get(self, workspace_id, key):
+        """(hit, value)"""
+        with self._lock:
+            entry = self._entries.get((workspace_id, key))
+            if (entry and entry[0] == self._current(workspace_id)
+                    and time.monotonic() - entry[1] <= self.ttl):
+                self._entries.move_to_end((workspace_id, key))
+                self._stats["hits"] += 1
+                return True, entry[2]
+            self._stats["misses"] += 1
+            return False, None
+
+    def put(self, workspace_id, key, value, version):
+        """Store a result read at `version`; dropped if a write bumped the workspace meanwhile."""
+        with self._lock:
+            if version != self._current(workspace_id):
+                return
+            self._entries[(workspace_id, key)] = (version, time.monotonic(), value)
+            self._entries.move_to_end((workspace_id, key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def bump(self, workspace_id):
+        with self._lock:
+            self._versions[workspace_id] = self._versions.get(workspace_id, 0) + 1
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        """Drop everything (a change we cannot attribute to one workspace); reads in flight won't be stored"""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._stats["invalidations"] += 1
+
+    def set_ttl(self, ttl):
+        with self._lock:
+            self.ttl = ttl
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            }
+
+_query_cache = _QueryCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+
+def _workspace_cached(method):
+    """
+    Cache a read method whose first argument is a workspace id. Remaining arguments
+    must be hashable. Callers get their own copy, so mutating a result is safe.
+    """
+    @functools.wraps(method)
+    def wrapper(self, workspace_id, *args):
+        ws = str(workspace_id)
+        key = (method.__name__, args)
+        hit, value = _query_cache.get(ws, key)
+        if not hit:
+            version = _query_cache.version(ws)
+            value = method(self, workspace_id, *args)
+            _query_cache.put(ws, key, value, version)
+        return copy.deepcopy(value)
+    wrapper.uncached = method
+    return wrapper
+
 class DreamShiftDB:
     def __init__(self):
         _load_streamlit_secrets_to_env()
@@ -31,25 +199,86 @@ class DreamShiftDB:
             raise ValueError("MONGODB_URI not found in .env file.")
             
         try:
-            self.client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-            # Trigger a connection check
-            self.client.admin.command('ping')
+            self.client = _get_client(MONGO_URI)
             self.db = self.client[DB_NAME]
             self.ObjectId = ObjectId
         except Exception as e:
             print(f"MongoDB Connection Failed: {e}")
             raise e
 
+        if DB_NAME not in _INDEXED_DBS:
+            self._ensure_indexes()
+            _INDEXED_DBS.add(DB_NAME)
+
+    def _raw(self, name):
+        """Collection handle that returns RawBSONDocument (list helpers turn them into records)"""
+        return self.db.get_collection(name, codec_options=RAW_CODEC)
+
+    def _index_specs(self):
+        """(collection, keys, options) for every index the query helpers rely on"""
+        specs = [
+            ("time_rollups", [("scope", ASCENDING), ("user_email", ASCENDING), ("day", ASCENDING)], {}),
+            ("time_entries", [("created_at", ASCENDING)], {}),
+            ("time_entries", [("task_id", ASCENDING), ("created_at", ASCENDING)], {}),
+            ("users", [("email", ASCENDING)], {}),
+            ("tasks", [("workspace_id", ASCENDING), ("due_date", ASCENDING)], {}),
+            ("tasks", [("workspace_id", ASCENDING), ("updated_at", ASCENDING)], {}),
+            ("tasks", [("assignee", ASCENDING), ("updated_at", ASCENDING)], {}),
+            ("users", [("feed_token", ASCENDING)], {
+                "unique": True, "partialFilterExpression": {"feed_token": {"$exists": True}},
+            }),
+            ("recurrence_leases", [("run_id", ASCENDING), ("index", ASCENDING)], {}),
+            # Recurrence upserts are idempotent only because of this one
+            ("tasks", [("recurrence_key", ASCENDING)], {
+                "unique": True, "partialFilterExpression": {"recurrence_key": {"$exists": True}},
+            }),
+            # Multikey: one entry per member, so membership lookups never scan other tenants
+            ("workspaces", [("members.email", ASCENDING)], {}),
+            ("interactions", [("source", ASCENDING), ("last_at", ASCENDING)], {}),
+            # Global search (one text index per collection; weights make titles outrank bodies)
+            ("tasks", [("title", "text"), ("description", "text")], {
+                "name": "search_text", "weights": {"title": 10, "description": 3}, "default_language": "english",
+            }),
+            ("projects", [("name", "text"), ("description", "text")], {
+                "name": "search_text", "weights": {"name": 10, "description": 3}, "default_language": "english",
+            }),
+            ("comments", [("text", "text")], {"name": "search_text", "default_language": "english"}),
+        ]
+        # Admin user table: case-insensitive prefix search and keyset pagination per sortable column
+        for field in self.ADMIN_USER_SORTS:
+            specs.append(("users", [(field, ASCENDING), ("_id", ASCENDING)], {
+                "name": f"admin_{field}_id", "collation": self.ADMIN_COLLATION,
+            }))
+        return specs
+
+    def _ensure_indexes(self):
+        """
+        Creates the indexes the query helpers rely on (idempotent, once per process).
+        Each index is created on its own, so one conflict doesn't skip the rest;
+        a unique index that can't be created is an error, since writes depend on it.
+        """
+        for coll, keys, options in self._index_specs():
+            try:
+                self.db[coll].create_index(keys, **options)
+            except Exception as e:
+                label = f"{coll}.{options.get('name') or '_'.join(f'{k}_{d}' for k, d in keys)}"
+                if options.get("unique"):
+                    raise RuntimeError(f"Could not create unique index {label}: {e}") from e
+                print(f"Index {label} skipped: {e}")
+
     # ==========================================
     # AUTHENTICATION & USERS
     # ==========================================
 
+    PROFILE_FIELDS = {"email": 1, "name": 1, "role": 1, "preferences": 1, "profile_version": 1}
+    AUTH_FIELDS = {**PROFILE_FIELDS, "password": 1}
+
     def create_user(self, email, password, name):
         """Creates a new user with hashed password."""
-        if self.db.users.find_one({"email": email}):
+        if self.db.users.find_one({"email": email}, {"_id": 1}):
             return False, "Email already registered."
         
-        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed = hash_password(password)
         user_doc = {
             "email": email,
             "password": hashed,
@@ -62,20 +291,71 @@ class DreamShiftDB:
         return True, "Account created."
 
     def authenticate_user(self, email, password):
-        """Checks email and password against database."""
-        user = self.db.users.find_one({"email": email})
-        if user:
-            try:
-                if bcrypt.checkpw(password.encode('utf-8'), user['password'].encode('utf-8')):
-                    return user
-            except:
-                # Fallback for legacy plain text passwords (if any)
-                if user['password'] == password: return user
-        return None
+        """
+        Checks email and password against database. Returns the user (without the hash) or None.
+        Plaintext records and hashes at an outdated cost are rehashed on a successful login.
+        """
+        user = self.db.users.find_one({"email": email}, self.AUTH_FIELDS)
+        if not user:
+            return None
+
+        stored = user.pop("password", None)
+        ok, needs_rehash = verify_password(password, stored)
+        if not ok:
+            return None
+        if needs_rehash:
+            # Conditional on the old hash, so a concurrent password reset wins
+            self.db.users.update_one(
+                {"_id": user["_id"], "password": stored},
+                {"$set": {"password": hash_password(password)}}
+            )
+        return user
     
     def get_user(self, email):
         return self.db.users.find_one({"email": email})
 
+    def get_user_profile(self, email):
+        """
+        Name, role, preferences and profile_version for a user, served from the
+        process-wide cache. Returns None for unknown users.
+        """
+        profile = _user_cache.get(email)
+        if profile is None:
+            profile = self.db.users.find_one({"email": email}, self.PROFILE_FIELDS)
+            if profile is None:
+                return None
+            profile.setdefault("profile_version", 0)
+            _user_cache.put(email, profile)
+        return profile
+
+    def cached_profile_version(self, email):
+        """Version of the cached profile, or None if this process holds none (never queries)"""
+        profile = _user_cache.get(email)
+        return profile.get("profile_version") if profile else None
+
+    def _update_profile(self, email, fields):
+        """
+        $set profile fields and bump profile_version, writing the new profile through
+        to the cache so this process's sessions see the newer version on their next read.
+        """
+        profile = self.db.users.find_one_and_update(
+            {"email": email},
+            {"$set": fields, "$inc": {"profile_version": 1}},
+            projection=self.PROFILE_FIELDS,
+            return_document=ReturnDocument.AFTER,
+        )
+        if profile:
+            _user_cache.put(email, profile)
+        else:
+            _user_cache.evict(email)
+        return profile
+
+    def update_user_preferences(self, email, preferences):
+        self._update_profile(email, {"preferences": preferences})
+
+    def set_user_role(self, email, role):
+        self._update_profile(email, {"role": role})
+
     def get_user_stats(self, email):
         """Returns basic productivity stats for the user."""
         total = self.db.tasks.count_documents({"assignee": email})
@@ -89,7 +369,8 @@ class DreamShiftDB:
 
     def create_password_reset_token(self, email):
         """Generates a token and sends an EMAIL."""
-        user = self.get_user(email)
+        from src.mailer import send_password_reset_email
+        user = self.db.users.find_one({"email": email}, {"_id": 1})
         if not user:
             return False, "User not found"
         
@@ -121,7 +402,7 @@ class DreamShiftDB:
         if record['expires_at'] < datetime.datetime.utcnow():
             return False, "Token expired."
             
-        hashed = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed = hash_password(new_password)
         
         self.db.users.update_one({"email": record['email']}, {"$set": {"password": hashed}})
         self.db.password_resets.update_one({"_id": record['_id']}, {"$set": {"used": True}})
@@ -133,9 +414,18 @@ class DreamShiftDB:
     # ==========================================
 
     def get_user_workspaces(self, email):
-        """Return ALL workspaces - no restrictions."""
-        return list(self.db.workspaces.find({}))
+        """Workspaces the user is a member of, projected to _id and name (served by the members.email index)."""
+        return list(self.db.workspaces.find({"members.email": email}, {"name": 1}).sort("_id", ASCENDING))
+
+    def get_membership_version(self, email):
+        """Counter bumped whenever the user joins or leaves a workspace (for caching the workspace list)."""
+        user = self.db.users.find_one({"email": email}, {"ws_version": 1})
+        return user.get("ws_version", 0) if user else 0
 
+    def _bump_membership_version(self, email):
+        self.db.users.update_one({"email": email}, {"$inc": {"ws_version": 1}})
+
+    @_workspace_cached
     def get_workspace_members(self, workspace_id):
         """Return workspace members enriched with names (fallback to email username)."""
         ws = self.db.workspaces.find_one({"_id": ObjectId(workspace_id)})
@@ -160,7 +450,9 @@ class DreamShiftDB:
             "members": [{"email": owner_email, "role": "Owner"}],
             "custom_statuses": ["To Do", "In Progress", "Review", "Completed"]
         }
-        return self.db.workspaces.insert_one(doc).inserted_id
+        ws_id = self.db.workspaces.insert_one(doc).inserted_id
+        self._bump_membership_version(owner_email)
+        return ws_id
 
     def add_workspace_member(self, ws_id, email, role="Employee"):
         if not self.db.users.find_one({"email": email}):
@@ -168,28 +460,75 @@ class DreamShiftDB:
         
         self.db.workspaces.update_one(
             {"_id": ObjectId(ws_id)},
-            {"$push": {"members": {"email": email, "role": role}}}
+            {"$push": {"members": {"email": email, "role": role}}, "$inc": {"members_version": 1}}
         )
+        self._bump_membership_version(email)
+        self.invalidate_workspace(ws_id)
         return True, "Added."
 
     def remove_workspace_member(self, ws_id, email):
         self.db.workspaces.update_one(
             {"_id": ObjectId(ws_id)},
-            {"$pull": {"members": {"email": email}}}
+            {"$pull": {"members": {"email": email}}, "$inc": {"members_version": 1}}
         )
+        self._bump_membership_version(email)
+        self.invalidate_workspace(ws_id)
+
+    def invalidate_workspace(self, workspace_id):
+        """Retire every cached read for a workspace (call after writing its data outside these helpers)."""
+        if workspace_id:
+            _query_cache.bump(str(workspace_id))
+
+    @staticmethod
+    def invalidate_all():
+        _query_cache.clear()
+
+    @staticmethod
+    def set_query_cache_ttl(ttl):
+        """Live change feeds make invalidation precise, so they raise the TTL; losing the feed lowers it again."""
+        _query_cache.set_ttl(ttl)
+
+    @staticmethod
+    def query_cache_version(workspace_id):
+        """Changes whenever the workspace's cached reads are retired (for session caches built on top of them)."""
+        return _query_cache.version(str(workspace_id))
 
+    @staticmethod
+    def query_cache_stats():
+        """Hit/miss/eviction counters and size of this process's query cache."""
+        return _query_cache.stats()
+
+    def get_members_version(self, ws_id):
+        """Counter bumped whenever the workspace gains or loses a member (for caching its directory)."""
+        ws = self.db.workspaces.find_one({"_id": ObjectId(ws_id)}, {"members_version": 1})
+        return ws.get("members_version", 0) if ws else None
+
+    @_workspace_cached
     def get_workspace_statuses(self, ws_id):
         ws = self.db.workspaces.find_one({"_id": ObjectId(ws_id)})
         return ws.get("custom_statuses", ["To Do", "In Progress", "Completed"]) if ws else []
 
     def update_workspace_statuses(self, ws_id, statuses):
         self.db.workspaces.update_one({"_id": ObjectId(ws_id)}, {"$set": {"custom_statuses": statuses}})
+        self.invalidate_workspace(ws_id)
+
+    @_workspace_cached
+    def get_workspace_projects(self, workspace_id):
+        return list(self.db.projects.find({"workspace_id": workspace_id}))
+
+    def create_project(self, project):
+        """Inserts a project document (must carry workspace_id). Returns its id."""
+        project_id = self.db.projects.insert_one(project).inserted_id
+        self.invalidate_workspace(project.get("workspace_id"))
+        return project_id
 
     # ==========================================
     # TASKS (Email Trigger)
     # ==========================================
 
     def create_task(self, ws_id, title, desc, due_date, assignee, status, priority, project_id, creator, start_date=None):
+        from src.mailer import send_task_assignment_email
+        now = datetime.datetime.utcnow()
         task_id = self.db.tasks.insert_one({
             "workspace_id": ws_id,
             "title": title,
@@ -202,22 +541,24 @@ class DreamShiftDB:
             "priority": priority,
             "project_id": project_id,
             "created_by": creator,
-            "created_at": datetime.datetime.utcnow(),
+            "created_at": now,
+            "updated_at": now,
             "subtasks": [],
             "status_history": [
                 {
                     "from": None,
                     "to": status,
                     "by": creator,
-                    "at": datetime.datetime.utcnow()
+                    "at": now
                 }
             ]
         }).inserted_id
+        self.invalidate_workspace(ws_id)
         
         # 📨 TRIGGER EMAIL + INBOX NOTIFICATION
         if assignee:
             # 1. Email (respect user preferences)
-            assignee_user = self.get_user(assignee)
+            assignee_user = self.get_user_profile(assignee)
             allow_email = True
             if assignee_user:
                 allow_email = assignee_user.get("preferences", {}).get("email_notifications", True)
@@ -229,8 +570,8 @@ class DreamShiftDB:
         return task_id
 
     def get_tasks_with_urgency(self, query):
-        """Fetches tasks and calculates urgency color locally."""
-        tasks = list(self.db.tasks.find(query))
+        """Fetches tasks (as TaskRecords, list fields only) and calculates urgency color locally."""
+        tasks = [TaskRecord.from_document(d) for d in self._raw("tasks").find(query, TaskRecord.projection())]
         now = datetime.datetime.utcnow()
         for t in tasks:
             t['urgency_color'] = "#4caf50" # Green
@@ -240,14 +581,58 @@ class DreamShiftDB:
                 elif diff < 48: t['urgency_color'] = "#f57c00" # Orange
         return tasks
 
+    @_workspace_cached
+    def get_workspace_board(self, workspace_id, statuses=(), priorities=()):
+        """Tasks board for a workspace, optionally filtered (pass tuples; results are cached)."""
+        query = {"workspace_id": workspace_id}
+        if statuses:
+            query["status"] = {"$in": list(statuses)}
+        if priorities:
+            query["priority"] = {"$in": list(priorities)}
+        return self.get_tasks_with_urgency(query)
+
+    CALENDAR_FIELDS = {"title": 1, "assignee": 1, "priority": 1, "status": 1, "start_date": 1, "due_date": 1}
+
+    def _calendar_stages(self, workspace_id, start, end):
+        """Match + light projection (with urgency) for tasks overlapping [start, end)."""
+        now = datetime.datetime.utcnow()
+        return [
+            {"$match": {
+                "workspace_id": workspace_id,
+                "due_date": {"$gte": start},
+                "$or": [
+                    {"start_date": {"$lt": end}},
+                    {"start_date": None, "due_date": {"$lt": end}},
+                ],
+            }},
+            {"$project": {
+                **self.CALENDAR_FIELDS,
+                "urgency_color": {"$switch": {
+                    "branches": [
+                        {"case": {"$lt": ["$due_date", now]}, "then": "#d32f2f"},
+                        {"case": {"$lt": ["$due_date", now + datetime.timedelta(hours=48)]}, "then": "#f57c00"},
+                    ],
+                    "default": "#4caf50",
+                }},
+            }},
+        ]
+
+    def get_calendar_tasks(self, workspace_id, start_date, end_date):
+        """Light task list for everything overlapping [start_date, end_date] (inclusive), ordered by due date."""
+        start = datetime.datetime.combine(start_date, datetime.time())
+        end = datetime.datetime.combine(end_date, datetime.time()) + datetime.timedelta(days=1)
+        pipeline = self._calendar_stages(workspace_id, start, end) + [{"$sort": {"due_date": 1}}]
+        return [TaskRecord.from_document(d) for d in self._raw("tasks").aggregate(pipeline)]
+
     def update_task_status(self, task_id, status, user_email=None):
         task = self.db.tasks.find_one({"_id": ObjectId(task_id)})
         if not task:
             return
 
-        updates = {"status": status}
+        now = datetime.datetime.utcnow()
+        updates = {"status": status, "updated_at": now}
         if status == "Completed" and not task.get("end_date"):
-            updates["end_date"] = datetime.datetime.utcnow()
+            updates["end_date"] = now
 
         self.db.tasks.update_one(
             {"_id": ObjectId(task_id)},
@@ -258,11 +643,19 @@ class DreamShiftDB:
                         "from": task.get("status"),
                         "to": status,
                         "by": user_email,
-                        "at": datetime.datetime.utcnow()
+                        "at": now
                     }
                 }
             }
         )
+        self.invalidate_workspace(task.get("workspace_id"))
+
+    def _update_task(self, query, update):
+        """update_one on a task that also retires its workspace's cached reads"""
+        task = self.db.tasks.find_one_and_update(query, update, projection={"workspace_id": 1})
+        if task:
+            self.invalidate_workspace(task.get("workspace_id"))
+        return task
 
     def update_task_dates(self, task_id, start_date=None, end_date=None):
         updates = {}
@@ -271,26 +664,324 @@ class DreamShiftDB:
         if end_date is not None:
             updates["end_date"] = datetime.datetime.combine(end_date, datetime.time()) if end_date else None
         if updates:
-            self.db.tasks.update_one({"_id": ObjectId(task_id)}, {"$set": updates})
+            updates["updated_at"] = datetime.datetime.utcnow()
+            self._update_task({"_id": ObjectId(task_id)}, {"$set": updates})
+
+    # ==========================================
+    # 🔁 RECURRING TASKS
+    # ==========================================
+
+    RECURRENCE_CATCH_UP_LIMIT = 366
+
+    RECURRING_QUERY = {
+        "recurring.pattern": {"$in": ["daily", "weekly", "monthly", "custom"]},
+        "recurring.active": {"$ne": False},
+    }
+
+    def get_recurring_tasks(self, lower_id=None, upper_id=None):
+        """Active recurring series (the parent tasks that carry a `recurring` rule), optionally within an _id range."""
+        query = dict(self.RECURRING_QUERY)
+        id_range = {}
+        if lower_id is not None:
+            id_range["$gte"] = lower_id
+        if upper_id is not None:
+            id_range["$lt"] = upper_id
+        if id_range:
+            query["_id"] = id_range
+        return list(self.db.tasks.find(query).sort("_id", 1))
+
+    def stop_task_recurrence(self, task_id):
+        self._update_task(
+            {"_id": ObjectId(task_id)},
+            {"$set": {"recurring.active": False, "updated_at": datetime.datetime.utcnow()}}
+        )
+
+    @staticmethod
+    def recurrence_rule(task):
+        """Builds the dateutil rrule for a recurring task, anchored on its due date."""
+        from dateutil import rrule
+        rec = task.get("recurring") or {}
+        anchor = task.get("due_date")
+        pattern = rec.get("pattern")
+        if not anchor or not pattern:
+            return None
+
+        until = rec.get("end_date")
+        if pattern == "daily":
+            return rrule.rrule(rrule.DAILY, dtstart=anchor, until=until)
+        if pattern == "weekly":
+            return rrule.rrule(rrule.WEEKLY, dtstart=anchor, until=until, byweekday=int(rec.get("day_of_week", 1)) % 7)
+        if pattern == "monthly":
+            # [day, -1] with bysetpos=1 picks the requested day, or the last day of shorter months
+            day = int(rec.get("day_of_month", 1))
+            return rrule.rrule(rrule.MONTHLY, dtstart=anchor, until=until, bymonthday=[day, -1], bysetpos=1)
+        if pattern == "custom":
+            return rrule.rrule(rrule.DAILY, dtstart=anchor, until=until, interval=max(1, int(rec.get("interval", 7))))
+        return None
+
+    def _recurrence_instance(self, parent, due, now):
+        """Task document for one occurrence of a recurring series."""
+        start = None
+        if parent.get("start_date") and parent.get("due_date"):
+            start = due - (parent["due_date"] - parent["start_date"])
+        return {
+            "workspace_id": parent.get("workspace_id"),
+            "title": parent.get("title"),
+            "description": parent.get("description", ""),
+            "start_date": start,
+            "due_date": due,
+            "end_date": None,
+            "assignee": parent.get("assignee"),
+            "status": "To Do",
+            "priority": parent.get("priority", "Medium"),
+            "project_id": parent.get("project_id"),
+            "created_by": parent.get("created_by"),
+            "created_at": now,
+            "updated_at": now,
+            "subtasks": [
+                {"id": str(ObjectId()), "title": s.get("title"), "completed": False}
+                for s in parent.get("subtasks", [])
+            ],
+            "status_history": [{"from": None, "to": "To Do", "by": "system", "at": now}],
+            "recurrence_of": str(parent["_id"]),
+            "recurrence_key": f"{parent['_id']}:{due.strftime('%Y-%m-%d')}",
+        }
+
+    def generate_recurring_tasks(self, now=None, tasks=None):
+        """
+        Generates every occurrence due up to `now` for all recurring series (or the given ones).
+        Instances are inserted with a single insert_many under unique recurrence keys, so re-runs
+        and overlapping runs never duplicate. Each series' last_generated is then advanced with $max.
+        Returns a summary dict.
+        """
+        now = now or datetime.datetime.utcnow()
+        series = self.get_recurring_tasks() if tasks is None else tasks
+
+        docs = []
+        updates = []
+        stopped = 0
+        for parent in series:
+            rule = self.recurrence_rule(parent)
+            if not rule:
+                continue
+            rec = parent.get("recurring") or {}
+            last = rec.get("last_generated") or parent["due_date"]
+
+            due = []
+            for occurrence in rule.xafter(last, count=self.RECURRENCE_CATCH_UP_LIMIT):
+                if occurrence > now:
+                    break
+                due.append(occurrence)
+            docs.extend(self._recurrence_instance(parent, d, now) for d in due)
+
+            changes = {}
+            if due:
+                changes["$max"] = {"recurring.last_generated": due[-1]}
+            end_date = rec.get("end_date")
+            if end_date and end_date <= now:
+                changes["$set"] = {"recurring.active": False}
+                stopped += 1
+            if changes:
+                updates.append(UpdateOne({"_id": parent["_id"]}, changes))
+
+        inserted = docs
+        if docs:
+            try:
+                self.db.tasks.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(err.get("code") != 11000 for err in errors):
+                    raise
+                skipped = {err["index"] for err in errors}
+                inserted = [d for i, d in enumerate(docs) if i not in skipped]
+
+        if updates:
+            self.db.tasks.bulk_write(updates, ordered=False)
+        for ws_id in {d.get("workspace_id") for d in inserted}:
+            self.invalidate_workspace(ws_id)
+
+        notifications = [
+            {
+                "user_email": d["assignee"], "title": "New Task", "message": f"Assigned: {d['title']}",
+                "type": "info", "link": None, "read": False, "created_at": now
+            }
+            for d in inserted if d.get("assignee")
+        ]
+        if notifications:
+            self.db.notifications.insert_many(notifications, ordered=False)
+
+        return {
+            "series": len(series),
+            "generated": len(inserted),
+            "duplicates": len(docs) - len(inserted),
+            "stopped": stopped,
+        }
+
+    # --- Sharded runs: _id-range shards claimed through leases in `recurrence_leases` ---
+
+    def plan_recurrence_shards(self, run_id, shard_count):
+        """
+        Splits the recurring series into _id-range shards for a run. The first host to plan a
+        run wins; later hosts reuse its boundaries so every host sees the same shards.
+        Returns the list of shard documents.
+        """
+        buckets = list(self.db.tasks.aggregate([
+            {"$match": self.RECURRING_QUERY},
+            {"$bucketAuto": {"groupBy": "$_id", "buckets": max(1, shard_count)}},
+        ]))
+        lowers = [None] + [b["_id"]["min"] for b in buckets[1:]]
+        bounds = [
+            {"lower": lower, "upper": lowers[i + 1] if i + 1 < len(lowers) else None}
+            for i, lower in enumerate(lowers)
+        ]
+
+        try:
+            self.db.recurrence_runs.insert_one({
+                "_id": run_id, "shards": bounds, "created_at": datetime.datetime.utcnow()
+            })
+        except DuplicateKeyError:
+            bounds = self.db.recurrence_runs.find_one({"_id": run_id})["shards"]
+
+        self.db.recurrence_leases.bulk_write([
+            UpdateOne(
+                {"_id": f"{run_id}:{i}"},
+                {"$setOnInsert": {
+                    "run_id": run_id, "index": i, "lower": b["lower"], "upper": b["upper"],
+                    "status": "pending", "owner": None, "lease_expires": None, "attempts": 0,
+                }},
+                upsert=True,
+            )
+            for i, b in enumerate(bounds)
+        ], ordered=False)
+        return list(self.db.recurrence_leases.find({"run_id": run_id}).sort("index", 1))
+
+    def claim_recurrence_shard(self, run_id, owner, lease_seconds=120):
+        """Leases the next pending shard, or one whose lease expired (its worker crashed)."""
+        now = datetime.datetime.utcnow()
+        return self.db.recurrence_leases.find_one_and_update(
+            {
+                "run_id": run_id,
+                "$or": [
+                    {"status": "pending"},
+                    {"status": "leased", "lease_expires": {"$lt": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "status": "leased",
+                    "owner": owner,
+                    "lease_expires": now + datetime.timedelta(seconds=lease_seconds),
+                    "started_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("index", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def renew_recurrence_lease(self, shard_id, owner, lease_seconds=120):
+        """Extends a held lease. Returns False if the lease was lost to another worker."""
+        result = self.db.recurrence_leases.update_one(
+            {"_id": shard_id, "owner": owner, "status": "leased"},
+            {"$set": {"lease_expires": datetime.datetime.utcnow() + datetime.timedelta(seconds=lease_seconds)}}
+        )
+        return result.modified_count == 1
+
+    def complete_recurrence_shard(self, shard_id, owner, summary):
+        self.db.recurrence_leases.update_one(
+            {"_id": shard_id, "owner": owner},
+            {"$set": {"status": "done", "finished_at": datetime.datetime.utcnow(), "summary": summary}}
+        )
+
+    def recurrence_wait_seconds(self, run_id):
+        """
+        None once every shard of the run is done; otherwise seconds until the earliest
+        outstanding lease expires and can be reclaimed (0 if a shard is claimable now).
+        """
+        now = datetime.datetime.utcnow()
+        open_shards = list(self.db.recurrence_leases.find(
+            {"run_id": run_id, "status": {"$ne": "done"}}, {"status": 1, "lease_expires": 1}
+        ))
+        if not open_shards:
+            return None
+        expiries = [s["lease_expires"] for s in open_shards if s["status"] == "leased" and s.get("lease_expires")]
+        if len(expiries) < len(open_shards):
+            return 0
+        return max(0.0, (min(expiries) - now).total_seconds())
+
+    def get_recurrence_run(self, run_id):
+        return list(self.db.recurrence_leases.find({"run_id": run_id}).sort("index", 1))
+
+    # ==========================================
+    # 📆 CALENDAR FEEDS (iCalendar subscriptions)
+    # ==========================================
+
+    FEED_FIELDS = {"title": 1, "priority": 1, "status": 1, "start_date": 1, "due_date": 1, "updated_at": 1, "created_at": 1}
+
+    def get_feed_token(self, email, reset=False):
+        """Secret token that authorizes a user's calendar feed URLs (created on first use)."""
+        if reset:
+            self.db.users.update_one({"email": email}, {"$set": {"feed_token": secrets.token_urlsafe(24)}})
+        else:
+            self.db.users.update_one(
+                {"email": email, "feed_token": {"$exists": False}},
+                {"$set": {"feed_token": secrets.token_urlsafe(24)}}
+            )
+        user = self.db.users.find_one({"email": email}, {"feed_token": 1})
+        return user.get("feed_token") if user else None
+
+    def get_user_by_feed_token(self, token):
+        if not token:
+            return None
+        return self.db.users.find_one({"feed_token": token}, {"email": 1, "name": 1})
+
+    def get_feed_query(self, email, workspace_id=None):
+        """Task query for a user's feed, or a workspace feed if they are a member (None otherwise)."""
+        if not workspace_id:
+            return {"assignee": email}
+        try:
+            member = self.db.workspaces.find_one(
+                {"_id": ObjectId(workspace_id), "members.email": email}, {"_id": 1}
+            )
+        except Exception:
+            return None
+        return {"workspace_id": workspace_id} if member else None
+
+    def get_feed_state(self, query):
+        """(task count, latest updated_at) for a feed query; both answered from indexes."""
+        count = self.db.tasks.count_documents(query)
+        latest = next(iter(self.db.tasks.find(query, {"updated_at": 1, "_id": 0}).sort("updated_at", -1).limit(1)), None)
+        return count, (latest or {}).get("updated_at")
+
+    def iter_feed_tasks(self, query, batch_size=500):
+        """Projected cursor over the feed's dated tasks."""
+        return self.db.tasks.find(
+            dict(query, due_date={"$ne": None}), self.FEED_FIELDS, batch_size=batch_size
+        ).sort("due_date", 1)
 
     # ==========================================
     # 🧩 TASK TEMPLATES
     # ==========================================
 
+    @_workspace_cached
     def get_task_templates(self, workspace_id):
         return list(self.db.task_templates.find({"workspace_id": workspace_id}).sort("created_at", -1))
 
     def create_task_template(self, workspace_id, name, tasks, created_by):
-        return self.db.task_templates.insert_one({
+        template_id = self.db.task_templates.insert_one({
             "workspace_id": workspace_id,
             "name": name,
             "tasks": tasks,
             "created_by": created_by,
             "created_at": datetime.datetime.utcnow()
         }).inserted_id
+        self.invalidate_workspace(workspace_id)
+        return template_id
 
     def delete_task_template(self, template_id):
-        self.db.task_templates.delete_one({"_id": ObjectId(template_id)})
+        template = self.db.task_templates.find_one_and_delete({"_id": ObjectId(template_id)}, projection={"workspace_id": 1})
+        if template:
+            self.invalidate_workspace(template.get("workspace_id"))
 
     # ==========================================
     # ☑️ SUBTASKS
@@ -298,15 +989,18 @@ class DreamShiftDB:
 
     def add_subtask(self, task_id, title):
         sub_id = str(ObjectId())
-        self.db.tasks.update_one(
+        self._update_task(
             {"_id": ObjectId(task_id)},
-            {"$push": {"subtasks": {"id": sub_id, "title": title, "completed": False}}}
+            {
+                "$push": {"subtasks": {"id": sub_id, "title": title, "completed": False}},
+                "$set": {"updated_at": datetime.datetime.utcnow()}
+            }
         )
 
     def toggle_subtask(self, task_id, subtask_id, completed):
-        self.db.tasks.update_one(
+        self._update_task(
             {"_id": ObjectId(task_id), "subtasks.id": subtask_id},
-            {"$set": {"subtasks.$.completed": completed}}
+            {"$set": {"subtasks.$.completed": completed, "updated_at": datetime.datetime.utcnow()}}
         )
 
     # ==========================================
@@ -314,7 +1008,7 @@ class DreamShiftDB:
     # ==========================================
 
     def add_comment(self, entity_type, entity_id, user_email, text, **kwargs):
-        user = self.get_user(user_email)
+        user = self.get_user_profile(user_email)
         comment = {
             "entity_type": entity_type,
             "entity_id": entity_id,
@@ -341,11 +1035,12 @@ class DreamShiftDB:
         )
 
     def get_comments(self, entity_type, entity_id):
-        return list(self.db.comments.find({
+        cursor = self._raw("comments").find({
             "entity_type": entity_type, 
             "entity_id": entity_id,
             "is_deleted": False
-        }).sort("created_at", 1))
+        }, CommentRecord.projection()).sort("created_at", 1)
+        return [CommentRecord.from_document(d) for d in cursor]
 
     def delete_comment(self, cid):
         self.db.comments.update_one(
@@ -366,17 +1061,233 @@ class DreamShiftDB:
     # ==========================================
 
     def log_time_entry(self, task_id, user_email, seconds, description=""):
+        now = datetime.datetime.utcnow()
         self.db.time_entries.insert_one({
             "task_id": task_id,
             "user_email": user_email,
             "seconds": seconds,
             "description": description,
-            "created_at": datetime.datetime.utcnow()
+            "created_at": now
         })
+        self._apply_time_rollups(task_id, user_email, seconds, now)
+
+    def _apply_time_rollups(self, task_id, user_email, seconds, at):
+        """Increments the per-task, per-user and per-user-day rollups in one round trip."""
+        day = datetime.datetime.combine(at.date(), datetime.time())
+        keys = [
+            (f"task:{task_id}", {"scope": "task", "task_id": task_id}),
+            (f"user:{user_email}", {"scope": "user", "user_email": user_email}),
+            (f"user_day:{user_email}:{day.strftime('%Y-%m-%d')}", {"scope": "user_day", "user_email": user_email, "day": day}),
+        ]
+        self.db.time_rollups.bulk_write([
+            UpdateOne(
+                {"_id": key},
+                {
+                    "$inc": {"seconds": seconds, "entries": 1},
+                    "$set": {"updated_at": at},
+                    "$setOnInsert": fields,
+                },
+                upsert=True,
+            )
+            for key, fields in keys
+        ], ordered=False)
+
+    def start_timer(self, user_email, task_id, task_title):
+        """
+        Starts the user's timer. One per user, keyed by email, so every device sees the same timer.
+        A timer already running is stopped and its time logged first; the swap is atomic,
+        so that time is logged once even if another device stops it at the same moment.
+
+        Returns:
+            (timer, stopped): the stored document, and (task_id, task_title, seconds)
+            for the timer it replaced, or None
+        """
+        timer = {
+            "_id": user_email,
+            "task_id": task_id,
+            "task_title": task_title,
+            "started_at": datetime.datetime.utcnow(),
+        }
+        previous = self.db.active_timers.find_one_and_replace(
+            {"_id": user_email}, timer, upsert=True, return_document=ReturnDocument.BEFORE,
+        )
+        if not previous:
+            return timer, None
+        seconds = max(0, int((timer["started_at"] - previous["started_at"]).total_seconds()))
+        self.log_time_entry(previous["task_id"], user_email, seconds)
+        return timer, (previous["task_id"], previous.get("task_title"), seconds)
+
+    def get_active_timer(self, user_email):
+        return self.db.active_timers.find_one({"_id": user_email})
+
+    def stop_timer(self, user_email):
+        """
+        Stops the running timer and logs it as one time entry.
+        The delete is atomic, so stopping from two devices logs the time once.
+
+        Returns:
+            (task_id, seconds) or None if no timer was running
+        """
+        timer = self.db.active_timers.find_one_and_delete({"_id": user_email})
+        if not timer:
+            return None
+        seconds = max(0, int((datetime.datetime.utcnow() - timer["started_at"]).total_seconds()))
+        self.log_time_entry(timer["task_id"], user_email, seconds)
+        return timer["task_id"], seconds
 
     def get_task_time_entries(self, task_id):
         return list(self.db.time_entries.find({"task_id": task_id}).sort("created_at", -1))
 
+    def get_task_time_total(self, task_id):
+        """Total seconds logged on a task, read from its rollup."""
+        doc = self.db.time_rollups.find_one({"_id": f"task:{task_id}"}, {"seconds": 1})
+        return doc.get("seconds", 0) if doc else 0
+
+    def get_user_time_total(self, email):
+        """Total seconds logged by a user, read from their rollup."""
+        doc = self.db.time_rollups.find_one({"_id": f"user:{email}"}, {"seconds": 1})
+        return doc.get("seconds", 0) if doc else 0
+
+    def get_user_time_by_day(self, email, start_date, end_date):
+        """Returns {date: seconds} for the user between start_date and end_date (inclusive)."""
+        start = datetime.datetime.combine(start_date, datetime.time())
+        end = datetime.datetime.combine(end_date, datetime.time()) + datetime.timedelta(days=1)
+        cursor = self.db.time_rollups.find(
+            {"scope": "user_day", "user_email": email, "day": {"$gte": start, "$lt": end}},
+            {"day": 1, "seconds": 1}
+        )
+        return {d["day"].date(): d.get("seconds", 0) for d in cursor}
+
+    ROLLUP_STAGING = "time_rollups_rebuild"
+
+    def rebuild_time_rollups(self):
+        """
+        Recomputes every time rollup from time_entries (backfill / repair job).
+        Rollups are built into a staging collection from the entries logged before the
+        run started, swapped in with a rename, and the entries logged meanwhile (whose
+        increments went to the old collection) are applied on top, so none is lost.
+        Entries without a user are left out of the user rollups rather than merged into one.
+        Returns the number of rollup documents written.
+        """
+        cutoff = datetime.datetime.utcnow()
+        staging = self.db[self.ROLLUP_STAGING]
+        staging.drop()
+        for coll, keys, options in self._index_specs():
+            if coll == "time_rollups":
+                staging.create_index(keys, **options)
+
+        merge = {"$merge": {"into": self.ROLLUP_STAGING, "whenMatched": "replace", "whenNotMatched": "insert"}}
+        day_str = {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}
+        logged = {"created_at": {"$lt": cutoff}}
+        with_user = {**logged, "user_email": {"$type": "string"}}
+        pipelines = [
+            [
+                {"$match": {**logged, "task_id": {"$ne": None}}},
+                {"$group": {
+                    "_id": {"$concat": ["task:", {"$toString": "$task_id"}]},
+                    "task_id": {"$first": "$task_id"},
+                    "seconds": {"$sum": "$seconds"},
+                    "entries": {"$sum": 1},
+                }},
+                {"$set": {"scope": "task", "updated_at": cutoff}},
+                merge,
+            ],
+            [
+                {"$match": with_user},
+                {"$group": {
+                    "_id": {"$concat": ["user:", "$user_email"]},
+                    "user_email": {"$first": "$user_email"},
+                    "seconds": {"$sum": "$seconds"},
+                    "entries": {"$sum": 1},
+                }},
+                {"$set": {"scope": "user", "updated_at": cutoff}},
+                merge,
+            ],
+            [
+                {"$match": with_user},
+                {"$group": {
+                    "_id": {"$concat": ["user_day:", "$user_email", ":", day_str]},
+                    "user_email": {"$first": "$user_email"},
+                    "day": {"$first": day_str},
+                    "seconds": {"$sum": "$seconds"},
+                    "entries": {"$sum": 1},
+                }},
+                {"$set": {"scope": "user_day", "day": {"$dateFromString": {"dateString": "$day"}}, "updated_at": cutoff}},
+                merge,
+            ],
+        ]
+        for pipeline in pipelines:
+            list(self.db.time_entries.aggregate(pipeline))
+
+        staging.rename("time_rollups", dropTarget=True)
+        swapped = datetime.datetime.utcnow()
+        # Entries from the rebuild window; later ones already incremented the new collection
+        for entry in self.db.time_entries.find({"created_at": {"$gte": cutoff, "$lt": swapped}}):
+            self._apply_time_rollups(entry["task_id"], entry.get("user_email"), entry.get("seconds", 0), entry["created_at"])
+        return self.db.time_rollups.count_documents({})
+
+    def iter_timesheet_batches(self, start_date, end_date, workspace_ids, batch_size=5000):
+        """
+        Streams time entries between start_date and end_date (inclusive) joined with
+        task title, project name and user name. Yields lists of at most batch_size rows,
+        so callers never hold the whole range in memory.
+        Only entries on tasks in `workspace_ids` are returned; callers pass the
+        workspaces the requesting user belongs to (an empty list exports nothing).
+        Joins use the let/$expr form of $lookup, so any MongoDB 4.0+ server runs it
+        ($convert is the newest operator used).
+        """
+        workspace_ids = [str(w) for w in workspace_ids]
+        if not workspace_ids:
+            return
+        start = datetime.datetime.combine(start_date, datetime.time())
+        end = datetime.datetime.combine(end_date, datetime.time()) + datetime.timedelta(days=1)
+
+        def to_oid(field):
+            return {"$convert": {"input": field, "to": "objectId", "onError": None, "onNull": None}}
+
+        def join(collection, local, foreign, fields, extra=None):
+            # Equality on the joined key in $expr uses the from collection's index
+            match = {"$expr": {"$eq": [f"${foreign}", "$$key"]}, **(extra or {})}
+            return {"$lookup": {
+                "from": collection,
+                "let": {"key": local},
+                "pipeline": [{"$match": match}, {"$project": {f: 1 for f in fields}}],
+                "as": collection,
+            }}
+
+        pipeline = [
+            {"$match": {"created_at": {"$gte": start, "$lt": end}}},
+            {"$sort": {"created_at": 1}},
+            # Time entries carry no workspace; the task join filters by it, so tasks
+            # of other workspaces are never returned and the entry drops at $unwind
+            join("tasks", to_oid("$task_id"), "_id", ["title", "project_id"],
+                 extra={"workspace_id": {"$in": workspace_ids}}),
+            {"$unwind": "$tasks"},
+            join("projects", to_oid("$tasks.project_id"), "_id", ["name"]),
+            join("users", "$user_email", "email", ["name"]),
+            {"$project": {
+                "_id": 0,
+                "date": "$created_at",
+                "user_email": 1,
+                "user_name": {"$ifNull": [{"$arrayElemAt": ["$users.name", 0]}, "$user_email"]},
+                "task_id": 1,
+                "task_title": {"$ifNull": ["$tasks.title", ""]},
+                "project_name": {"$ifNull": [{"$arrayElemAt": ["$projects.name", 0]}, ""]},
+                "seconds": {"$ifNull": ["$seconds", 0]},
+                "description": {"$ifNull": ["$description", ""]},
+            }},
+        ]
+
+        batch = []
+        cursor = self.db.time_entries.aggregate(pipeline, allowDiskUse=True, batchSize=batch_size)
+        for row in cursor:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
     # ==========================================
     # 📅 EXTENSIONS (Inbox Only)
     # ==========================================
@@ -417,18 +1328,42 @@ class DreamShiftDB:
         })
 
     def get_unread_notifications(self, email):
-        return list(self.db.notifications.find({"user_email": email, "read": False}).sort("created_at", -1))
+        cursor = self._raw("notifications").find(
+            {"user_email": email, "read": False}, NotificationRecord.projection()
+        ).sort("created_at", -1)
+        return [NotificationRecord.from_document(d) for d in cursor]
         
     def mark_notification_read(self, nid):
         self.db.notifications.update_one({"_id": ObjectId(nid)}, {"$set": {"read": True}})
 
+    def record_interactions(self, source_email, target_emails):
+        """Remember who a user mentions and when (ranks the mention picker)."""
+        if not target_emails:
+            return
+        now = datetime.datetime.utcnow()
+        self.db.interactions.bulk_write([
+            UpdateOne(
+                {"_id": f"{source_email}:{target}"},
+                {"$set": {"source": source_email, "target": target, "last_at": now}, "$inc": {"count": 1}},
+                upsert=True,
+            )
+            for target in target_emails
+        ], ordered=False)
+
+    def get_recent_contacts(self, email, limit=200):
+        """{email: last interaction time} for the people this user interacted with most recently."""
+        cursor = self.db.interactions.find({"source": email}, {"target": 1, "last_at": 1, "_id": 0}).sort("last_at", -1).limit(limit)
+        return {doc["target"]: doc["last_at"] for doc in cursor}
+
     def handle_mentions(self, text, source_user, source_email, entity_type, entity_id, workspace_id=None):
         """Parses @mentions (name or email), creates Inbox notifications, and sends email."""
+        from src.mailer import send_mention_email
         targets = {}
 
         name_lookup = {}
         if workspace_id:
-            for m in self.get_workspace_members(workspace_id):
+            from src.mentions import get_member_directory
+            for m in get_member_directory(self, workspace_id).members:
                 name = (m.get('name') or '').strip()
                 email = m.get('email')
                 if name and email and name.lower() not in name_lookup:
@@ -458,15 +1393,153 @@ class DreamShiftDB:
                 entity_label = f"project: {project.get('name', 'Project')}"
                 link = f"{app_base_url}/projects"
 
+        if source_email:
+            self.record_interactions(source_email, [e for e in targets.values() if e.lower() != source_email.lower()])
+
         for email in targets.values():
             if source_email and email.lower() == source_email.lower():
                 continue
 
             self.create_notification(email, "Mentioned", f"{source_user} mentioned you.", "mention", link)
 
-            user = self.get_user(email)
+            user = self.get_user_profile(email)
             allow_email = True
             if user:
                 allow_email = user.get("preferences", {}).get("email_notifications", True)
             if allow_email:
-                send_mention_email(email, source_user, entity_label, text, link)
\ No newline at end of file
+                send_mention_email(email, source_user, entity_label, text, link)
+
+    # ==========================================
+    # 🛡️ ADMIN
+    # ==========================================
+
+    ADMIN_USER_FIELDS = {"name": 1, "email": 1, "role": 1, "created_at": 1}
+    ADMIN_USER_SORTS = ["email", "name", "created_at"]
+    # Case-insensitive comparisons; U+FFFF sorts after every character under this collation,
+    # so [prefix, prefix + U+FFFF) is an index range for "starts with"
+    ADMIN_COLLATION = {"locale": "en", "strength": 2}
+
+    @staticmethod
+    def _keyset_filter(field, value, last_id, descending):
+        """Rows strictly after (value, last_id) in (field, _id) order. Missing values sort first ascending."""
+        op = "$lt" if descending else "$gt"
+        tie = {field: value, "_id": {op: last_id}}
+        if value is None:
+            return tie if descending else {"$or": [tie, {field: {"$ne": None}}]}
+        after = [{field: {op: value}}, tie]
+        if descending:
+            after.append({field: None})
+        return {"$or": after}
+
+    def list_users_page(self, search="", sort="email", descending=False, after=None, limit=50):
+        """
+        One page of the admin user table, without passwords.
+
+        Args:
+            search: Case-insensitive prefix of email or name
+            sort: One of ADMIN_USER_SORTS
+            descending: Sort direction
+            after: Cursor returned with the previous page (None for the first page)
+            limit: Page size
+
+        Returns:
+            (rows, next_cursor) where next_cursor is None on the last page
+        """
+        if sort not in self.ADMIN_USER_SORTS:
+            raise ValueError(f"Unsupported sort column: {sort}")
+
+        clauses = []
+        search = (search or "").strip()
+        if search:
+            prefix = {"$gte": search, "$lt": search + "\uffff"}
+            clauses.append({"$or": [{"email": prefix}, {"name": prefix}]})
+        if after:
+            clauses.append(self._keyset_filter(sort, after["value"], after["id"], descending))
+        query = {"$and": clauses} if clauses else {}
+
+        direction = -1 if descending else 1
+        rows = list(
+            self.db.users.find(query, self.ADMIN_USER_FIELDS, collation=self.ADMIN_COLLATION)
+            .sort([(sort, direction), ("_id", direction)])
+            .limit(limit + 1)
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = {"value": last.get(sort), "id": last["_id"]}
+        return rows, next_cursor
+
+    def get_admin_counts(self):
+        """Approximate collection sizes from collection metadata (no scans)."""
+        return {
+            "users": self.db.users.estimated_document_count(),
+            "tasks": self.db.tasks.estimated_document_count(),
+            "workspaces": self.db.workspaces.estimated_document_count(),
+        }
+
+    # ==========================================
+    # 🔎 SEARCH
+    # ==========================================
+
+    # (collection, kind, fields to return, extra filter)
+    SEARCH_SOURCES = [
+        ("tasks", "task", {"title": 1, "description": 1, "workspace_id": 1, "project_id": 1}, {}),
+        ("projects", "project", {"name": 1, "description": 1, "workspace_id": 1}, {}),
+        ("comments", "comment", {"text": 1, "workspace_id": 1, "entity_type": 1, "entity_id": 1, "user_name": 1}, {"is_deleted": {"$ne": True}}),
+    ]
+    SEARCH_SNIPPET = 140
+
+    @classmethod
+    def _search_hit(cls, kind, doc):
+        """Uniform result row; `target` is what the result opens (the task or project a comment is on)"""
+        if kind == "task":
+            title, body, target = doc.get("title"), doc.get("description"), ("task", str(doc["_id"]))
+        elif kind == "project":
+            title, body, target = doc.get("name"), doc.get("description"), ("project", str(doc["_id"]))
+        else:
+            title = f"Comment by {doc.get('user_name') or 'someone'}"
+            body, target = doc.get("text"), (doc.get("entity_type"), str(doc.get("entity_id")))
+        body = (body or "").strip()
+        if len(body) > cls.SEARCH_SNIPPET:
+            body = body[:cls.SEARCH_SNIPPET].rstrip() + "…"
+        return {
+            "kind": kind,
+            "id": str(doc["_id"]),
+            "title": title or "Untitled",
+            "snippet": body,
+            "workspace_id": doc.get("workspace_id"),
+            "target": target,
+            "score": doc.get("score", 0.0),
+        }
+
+    def search(self, email, query, page=0, page_size=20):
+        """
+        Ranked full-text search over task titles/descriptions, project names/descriptions
+        and comment text, limited to workspaces the user belongs to.
+
+        Each collection answers from its text index, sorted by score and cut at the
+        deepest row the requested page can need; the three lists are then merged by score.
+
+        Returns:
+            (hits, has_more)
+        """
+        query = (query or "").strip()
+        if not query:
+            return [], False
+        ws_ids = [str(w["_id"]) for w in self.get_user_workspaces(email)]
+        if not ws_ids:
+            return [], False
+
+        needed = (page + 1) * page_size + 1
+        hits = []
+        for collection, kind, fields, extra in self.SEARCH_SOURCES:
+            cursor = self.db[collection].find(
+                {"$text": {"$search": query}, "workspace_id": {"$in": ws_ids}, **extra},
+                {**fields, "score": {"$meta": "textScore"}},
+            ).sort([("score", {"$meta": "textScore"})]).limit(needed)
+            hits.extend(self._search_hit(kind, doc) for doc in cursor)
+
+        hits.sort(key=lambda h: h["score"], reverse=True)
+        start = page * page_size
+        return hits[start:start + page_size], len(hits) > start + page_size
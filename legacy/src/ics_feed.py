@@ -0,0 +1,115 @@
+"""
+iCalendar feeds for DreamShift EMS
+Streams a VCALENDAR for a user's tasks or a workspace's tasks, with an ETag derived from
+the feed's task count and latest updated_at so polling clients get cheap 304s.
+"""
+
+import datetime
+import hashlib
+import threading
+from collections import OrderedDict
+
+PRODID = "-//DreamShift//EMS Calendar Feed//EN"
+CACHE_SIZE = 256
+CACHE_MAX_BYTES = 2 * 1024 * 1024
+
+def _escape(text):
+    return (
+        str(text or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+def _fold(line):
+    """Folds a content line at 75 octets as RFC 5545 requires."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts = []
+    while raw:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(raw))
+        # Do not split inside a multi-byte character
+        while cut < len(raw) and (raw[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(raw[:cut].decode("utf-8"))
+        raw = raw[cut:]
+    return "\r\n ".join(parts) + "\r\n"
+
+def _date(value):
+    return value.strftime("%Y%m%d")
+
+def _stamp(value):
+    return (value or datetime.datetime.utcnow()).strftime("%Y%m%dT%H%M%SZ")
+
+def feed_etag(scope_key, count, latest):
+    """Strong ETag for a feed; changes whenever a task is added, removed or updated."""
+    seed = f"{scope_key}|{count}|{latest.isoformat() if latest else '-'}"
+    return '"' + hashlib.sha1(seed.encode("utf-8")).hexdigest() + '"'
+
+def iter_ics(tasks, calendar_name):
+    """Yields the feed text chunk by chunk, one VEVENT per task."""
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+    yield _fold(f"PRODID:{PRODID}")
+    yield "CALSCALE:GREGORIAN\r\nMETHOD:PUBLISH\r\n"
+    yield _fold(f"X-WR-CALNAME:{_escape(calendar_name)}")
+
+    for t in tasks:
+        due = t["due_date"]
+        start = t.get("start_date") or due
+        if start > due:
+            start = due
+        description = f"Priority: {t.get('priority', 'Medium')}\nStatus: {t.get('status', 'To Do')}"
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:{t['_id']}@dreamshift",
+            f"DTSTAMP:{_stamp(t.get('updated_at') or t.get('created_at'))}",
+            f"DTSTART;VALUE=DATE:{_date(start)}",
+            f"DTEND;VALUE=DATE:{_date(due + datetime.timedelta(days=1))}",
+            f"SUMMARY:{_escape(t.get('title'))}",
+            f"DESCRIPTION:{_escape(description)}",
+            "END:VEVENT",
+        ]
+        yield "".join(_fold(line) for line in lines)
+    yield "END:VCALENDAR\r\n"
+
+class FeedCache:
+    """Thread-safe LRU of rendered feeds keyed by feed scope and validated by ETag."""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, etag):
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry or entry[0] != etag:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, etag, body):
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+def resolve_feed(db, token, workspace_id=None):
+    """
+    Resolves a feed request to (scope_key, query, calendar_name), or None if the
+    token is unknown or the user is not a member of the workspace.
+    """
+    user = db.get_user_by_feed_token(token)
+    if not user:
+        return None
+    query = db.get_feed_query(user["email"], workspace_id)
+    if query is None:
+        return None
+    if workspace_id:
+        return f"ws:{workspace_id}", query, "DreamShift Workspace"
+    return f"user:{user['email']}", query, f"DreamShift – {user.get('name') or user['email']}"
@@ -0,0 +1,115 @@
+"""
+Mention directory for DreamShift EMS
+Per-workspace prefix index over member names and emails: a sorted array of
+normalized keys searched with bisect, so a type-ahead lookup touches only the
+matching slice instead of the whole member list. Directories are built once per
+process from the workspace members and rebuilt when membership changes.
+"""
+
+import bisect
+import datetime
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+DIRECTORY_CACHE_SIZE = 64
+# Member names come from user profiles, which can change without a membership change
+DIRECTORY_TTL = 300
+# Prefix matches considered for ranking (short prefixes in huge workspaces stop here)
+CANDIDATE_LIMIT = 500
+
+def normalize(text):
+    """Casefolded, accent-stripped form used for keys and queries"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+def _member_keys(member):
+    """Full name, each name part, email and email local part"""
+    name = normalize(member.get("name"))
+    email = normalize(member.get("email"))
+    keys = {name, email, email.split("@")[0]}
+    keys.update(name.split())
+    return {k for k in keys if k}
+
+class MemberDirectory:
+    """Prefix index over one workspace's members"""
+
+    def __init__(self, members):
+        self.members = [m for m in members if m.get("email")]
+        pairs = sorted((key, i) for i, m in enumerate(self.members) for key in _member_keys(m))
+        self._keys = [key for key, _ in pairs]
+        self._owners = [i for _, i in pairs]
+        self._by_email = {normalize(m["email"]): i for i, m in enumerate(self.members)}
+
+    def __len__(self):
+        return len(self.members)
+
+    def prefix(self, query, limit=CANDIDATE_LIMIT):
+        """Indexes of members with a key starting with `query`, in key order (deduplicated)"""
+        query = normalize(query)
+        found = []
+        seen = set()
+        i = bisect.bisect_left(self._keys, query)
+        while i < len(self._keys) and self._keys[i].startswith(query) and len(found) < limit:
+            owner = self._owners[i]
+            if owner not in seen:
+                seen.add(owner)
+                found.append(owner)
+            i += 1
+        return found
+
+    def search(self, query, k=8, recent=None, exclude=()):
+        """
+        Top-k members matching a prefix, most recently interacted-with first.
+
+        Args:
+            query: Typed prefix (empty: recent contacts only)
+            k: Result count
+            recent: {email: last interaction datetime} for the searching user
+            exclude: Emails to leave out (the user themself, already-picked members)
+        """
+        recent = {normalize(e): at for e, at in (recent or {}).items()}
+        skip = {normalize(e) for e in exclude}
+
+        if normalize(query):
+            candidates = self.prefix(query)
+        else:
+            candidates = [self._by_email[e] for e in recent if e in self._by_email]
+
+        epoch = datetime.datetime.min
+        ranked = sorted(
+            (i for i in candidates if normalize(self.members[i]["email"]) not in skip),
+            key=lambda i: (
+                -(recent.get(normalize(self.members[i]["email"]), epoch) - epoch).total_seconds(),
+                normalize(self.members[i].get("name") or self.members[i]["email"]),
+            ),
+        )
+        return [self.members[i] for i in ranked[:k]]
+
+_directories = OrderedDict()
+_directories_lock = threading.Lock()
+
+def get_member_directory(db, workspace_id):
+    """
+    Cached directory for a workspace. Checks the workspace's members_version
+    (one indexed point read) and rebuilds only when it moved or the entry aged out.
+    """
+    version = db.get_members_version(workspace_id)
+    if version is None:
+        return MemberDirectory([])
+
+    key = str(workspace_id)
+    with _directories_lock:
+        entry = _directories.get(key)
+        if entry and entry[0] == version and time.monotonic() - entry[1] < DIRECTORY_TTL:
+            _directories.move_to_end(key)
+            return entry[2]
+
+    directory = MemberDirectory(db.get_workspace_members(workspace_id))
+    with _directories_lock:
+        _directories[key] = (version, time.monotonic(), directory)
+        _directories.move_to_end(key)
+        while len(_directories) > DIRECTORY_CACHE_SIZE:
+            _directories.popitem(last=False)
+    return directory
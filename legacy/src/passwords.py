@@ -0,0 +1,70 @@
+"""
+Password hashing for DreamShift EMS
+bcrypt runs in a small bounded thread pool (bcrypt releases the GIL while hashing),
+so a burst of logins queues here instead of stalling every session's reruns.
+The work factor comes from BCRYPT_ROUNDS; hashes at another cost, and legacy
+plaintext records, are reported as needing a rehash so login can upgrade them.
+"""
+
+import hmac
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_BCRYPT_HASH = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _executor():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _pool
+
+def _hash(password, rounds):
+    import bcrypt
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+def _check(password, stored):
+    import bcrypt
+    return bcrypt.checkpw(password.encode("utf-8"), stored.encode("utf-8"))
+
+def hash_cost(stored):
+    """Work factor of a bcrypt hash, or None if `stored` is not a bcrypt hash"""
+    match = _BCRYPT_HASH.match(stored or "")
+    return int(match.group(1)) if match else None
+
+def hash_password(password, rounds=None):
+    """bcrypt hash at the configured cost, computed on the hashing pool"""
+    return _executor().submit(_hash, password, rounds or BCRYPT_ROUNDS).result()
+
+def verify_password(password, stored):
+    """
+    Check a password against a stored hash.
+
+    Returns:
+        (ok, needs_rehash): needs_rehash is True when the password matched but the
+        record is plaintext or was hashed at a cost other than BCRYPT_ROUNDS
+    """
+    if not stored:
+        return False, False
+
+    cost = hash_cost(stored)
+    if cost is None:
+        # Legacy plaintext record
+        ok = hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+        return ok, ok
+
+    try:
+        ok = _executor().submit(_check, password, stored).result()
+    except ValueError:
+        # Malformed hash
+        return False, False
+    return ok, ok and cost != BCRYPT_ROUNDS
@@ -0,0 +1,103 @@
+"""
+List records for DreamShift EMS
+List APIs (boards, calendar, comment threads, inbox) read MongoDB results as
+RawBSONDocument and copy only the projected fields into __slots__ records, so a
+workspace-sized list holds no per-row dict and none of the fields it never shows.
+Records keep dict-style reads (rec["title"], rec.get("due_date"), "x" in rec), so
+pages written against documents keep working; computed values such as
+urgency_color are ordinary fields.
+"""
+
+import bson
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+
+# Decode results lazily; records pick out their fields
+RAW_CODEC = CodecOptions(document_class=RawBSONDocument)
+
+_MISSING = object()
+
+def _plain(value):
+    """Nested raw documents become ordinary dicts (callers may read or copy them)"""
+    if isinstance(value, RawBSONDocument):
+        return bson.decode(value.raw)
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+class Record:
+    """
+    Base for slotted list rows. Subclasses list their fields in __slots__;
+    fields named in COMPUTED are filled in by the query helper, not read from MongoDB.
+    A field absent from the document stays unset: rec.get() returns the default, rec[...] raises KeyError.
+    """
+
+    __slots__ = ()
+    COMPUTED = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = frozenset(cls.__slots__)
+
+    @classmethod
+    def projection(cls):
+        """Find projection for the stored fields"""
+        return {f: 1 for f in cls.__slots__ if f not in cls.COMPUTED}
+
+    @classmethod
+    def from_document(cls, doc):
+        """Build from a RawBSONDocument (or any mapping), keeping only this record's fields"""
+        rec = cls.__new__(cls)
+        for name in cls.__slots__:
+            value = doc.get(name, _MISSING)
+            if value is not _MISSING:
+                setattr(rec, name, _plain(value))
+        return rec
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self._fields:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self._fields and hasattr(self, key)
+
+    def get(self, key, default=None):
+        value = getattr(self, key, _MISSING) if key in self._fields else _MISSING
+        return default if value is _MISSING else value
+
+    def keys(self):
+        return [f for f in self.__slots__ if hasattr(self, f)]
+
+    def to_dict(self):
+        return {f: getattr(self, f) for f in self.keys()}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+class TaskRecord(Record):
+    """A task as boards, the calendar and task lists show it"""
+    __slots__ = (
+        "_id", "title", "status", "priority", "assignee", "start_date", "due_date",
+        "project_id", "workspace_id", "urgency_color",
+    )
+    COMPUTED = ("urgency_color",)
+
+class CommentRecord(Record):
+    """A comment as the thread view renders it"""
+    __slots__ = (
+        "_id", "parent_comment_id", "user_email", "user_name", "text", "created_at",
+        "reactions", "is_pinned", "is_deleted", "deleted_at", "edited_at", "edit_count",
+        "quoted_text", "quoted_author",
+    )
+
+class NotificationRecord(Record):
+    """An inbox item"""
+    __slots__ = ("_id", "title", "message", "type", "link", "created_at")
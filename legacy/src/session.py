@@ -0,0 +1,87 @@
+"""
+Session claims for DreamShift EMS
+At sign-in the user's name, role and notification preferences are packed into an
+HMAC-signed, expiring claim kept in session state. Pages read the claim instead of
+re-fetching the user document; an expired claim, or one older than the current
+profile version, is re-issued from the shared user cache.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+import streamlit as st
+
+# Set SESSION_SECRET to keep claims valid across restarts; otherwise each process signs with its own key
+SESSION_SECRET = (os.getenv("SESSION_SECRET") or secrets.token_hex(32)).encode("utf-8")
+CLAIM_TTL = int(os.getenv("SESSION_CLAIM_TTL", "900"))
+CLAIM_KEY = "_session_claim"
+
+def _sign(payload: bytes) -> str:
+    return hmac.new(SESSION_SECRET, payload, hashlib.sha256).hexdigest()
+
+def encode_claim(profile, ttl=CLAIM_TTL) -> str:
+    """Signed token carrying the fields pages need; valid for `ttl` seconds"""
+    body = {
+        "email": profile.get("email"),
+        "name": profile.get("name"),
+        "role": profile.get("role", "Member"),
+        "preferences": profile.get("preferences") or {},
+        "ver": profile.get("profile_version", 0),
+        "exp": int(time.time()) + ttl,
+    }
+    payload = base64.urlsafe_b64encode(json.dumps(body, separators=(",", ":")).encode("utf-8"))
+    return f"{payload.decode('ascii')}.{_sign(payload)}"
+
+def decode_claim(token):
+    """Claim body if the signature is valid and it has not expired, else None"""
+    try:
+        payload, signature = token.rsplit(".", 1)
+    except (AttributeError, ValueError):
+        return None
+    if not hmac.compare_digest(_sign(payload.encode("ascii")), signature):
+        return None
+    body = json.loads(base64.urlsafe_b64decode(payload))
+    if body.get("exp", 0) < time.time():
+        return None
+    return body
+
+def issue_claim(profile):
+    """Store a fresh claim for the signed-in user (call after login or a profile change)"""
+    st.session_state[CLAIM_KEY] = encode_claim(profile)
+    st.session_state.user_email = profile.get("email")
+    st.session_state.user_name = profile.get("name")
+
+def current_user(db, refresh=False):
+    """
+    The signed-in user's claim: email, name, role, preferences.
+    Costs no query while the claim is valid and this process has the profile cached;
+    re-issued from db.get_user_profile when it expires, when the profile version has
+    moved past the claim's, or on refresh.
+    """
+    email = st.session_state.get("user_email")
+    if not email:
+        return None
+
+    claim = None if refresh else decode_claim(st.session_state.get(CLAIM_KEY))
+    if claim and claim.get("email") == email:
+        version = db.cached_profile_version(email)
+        if version is None:
+            # Not cached here (entry expired, or another process served the login):
+            # check the stored version with one point read rather than trusting the claim,
+            # so a role change made elsewhere applies within the cache TTL
+            profile = db.get_user_profile(email)
+            if not profile:
+                return None
+            version = profile.get("profile_version", 0)
+        if version <= claim.get("ver", 0):
+            return claim
+
+    profile = db.get_user_profile(email)
+    if not profile:
+        return None
+    issue_claim(profile)
+    return decode_claim(st.session_state[CLAIM_KEY])
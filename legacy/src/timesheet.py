@@ -0,0 +1,64 @@
+"""
+Timesheet export for DreamShift EMS
+Streams time entries from the database in batches and writes them incrementally
+as CSV or Parquet, so memory stays bounded regardless of the date range.
+"""
+
+COLUMNS = ["date", "user_name", "user_email", "project_name", "task_title", "task_id", "hours", "seconds", "description"]
+FORMATS = {"CSV": "csv", "Parquet": "parquet"}
+
+def _batch_frame(rows):
+    """Turns a batch of joined time entry rows into a DataFrame with stable columns."""
+    import pandas as pd
+
+    df = pd.DataFrame(rows, columns=[c for c in COLUMNS if c != "hours"])
+    df["date"] = pd.to_datetime(df["date"])
+    df["seconds"] = df["seconds"].fillna(0).astype("int64")
+    df["hours"] = (df["seconds"] / 3600).round(2)
+    for col in ["user_name", "user_email", "project_name", "task_title", "task_id", "description"]:
+        df[col] = df[col].fillna("").astype(str)
+    return df[COLUMNS]
+
+def _write_csv(batches, path):
+    rows = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(COLUMNS) + "\n")
+        for batch in batches:
+            df = _batch_frame(batch)
+            df.to_csv(f, header=False, index=False)
+            rows += len(df)
+    return rows
+
+def _write_parquet(batches, path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow).")
+
+    schema = pa.schema(
+        [("date", pa.timestamp("ns")), ("hours", pa.float64()), ("seconds", pa.int64())]
+        + [(c, pa.string()) for c in COLUMNS if c not in ("date", "hours", "seconds")]
+    )
+    schema = pa.schema([schema.field(c) for c in COLUMNS])
+    rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in batches:
+            df = _batch_frame(batch)
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+            rows += len(df)
+    return rows
+
+def export_timesheet(db, path, start_date, end_date, workspace_ids, fmt="csv", batch_size=5000):
+    """
+    Writes the timesheet for [start_date, end_date] to path as "csv" or "parquet",
+    limited to entries on tasks in `workspace_ids` (the caller's workspaces).
+    Only one batch of rows is held in memory at a time.
+    Returns the number of rows written.
+    """
+    batches = db.iter_timesheet_batches(start_date, end_date, workspace_ids, batch_size=batch_size)
+    if fmt == "csv":
+        return _write_csv(batches, path)
+    if fmt == "parquet":
+        return _write_parquet(batches, path)
+    raise ValueError(f"Unsupported export format: {fmt}")
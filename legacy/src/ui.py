@@ -1,23 +1,30 @@
 import streamlit as st
-import time
+import datetime
 from pathlib import Path
+from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from src.database import DreamShiftDB
+from components.icons import get_icon_registry
+from components.assets import inject_once, inject_stylesheet
+from components.timer import render_running_timer
+from src.change_feed import LIVE_UPDATES, LIVE_REFRESH, get_change_feed, start_change_feed
+
+# Fragments that poll the change feed; None leaves them to rerun only on interaction
+LIVE_RUN_EVERY = LIVE_REFRESH if LIVE_UPDATES else None
 
 def load_global_css():
-    try:
-        with open("static/styles.css", "r", encoding="utf-8") as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-    except FileNotFoundError:
-        pass
+    """Global stylesheet and icon sprite; each crosses the websocket once per session"""
+    inject_stylesheet("static/styles.css", group="global-css")
+    load_icon_sprite()
+
+def load_icon_sprite():
+    """Puts the SVG sprite in the page once per session so icons can be <use> references"""
+    icons = get_icon_registry()
+    inject_once(icons.sprite_id(), icons.sprite(), group="icons", target="body")
 
 def get_svg(filename, width=24, height=24):
-    """Returns SVG string wrapped in a div"""
-    path = Path(f"static/icons/{filename}")
-    if path.exists():
-        content = path.read_text()
-        # Basic dimensions injection if needed, though mostly handled by CSS
-        return f'<div style="width:{width}px; height:{height}px; display:flex; align-items:center; justify-content:center;">{content}</div>'
-    return ""
+    """Returns SVG string wrapped in a div (a reference into the preloaded sprite)"""
+    return get_icon_registry().use(Path(filename).stem, width, height)
 
 def get_status_icon(status_type):
     """Returns Material icon string for status messages (success, error, warning, info)"""
@@ -29,48 +36,125 @@ def get_status_icon(status_type):
     }
     return icons.get(status_type, ":material/info:")
 
+def rerun_fragment():
+    """Rerun only the enclosing fragment (falls back to a full rerun when not inside one)"""
+    # The user's own write must show even before the change feed reports it
+    st.session_state.pop("_live", None)
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+def live_data(key, topics, loader):
+    """
+    Data for a live fragment. On a timed fragment rerun the session's previous
+    snapshot is reused while the change feed reports no change on `topics`, so an
+    idle board polls memory, not MongoDB. Full-page runs always load.
+    """
+    feed = get_change_feed()
+    ctx = get_script_run_ctx()
+    if not feed or not feed.healthy or not getattr(ctx, "fragment_ids_this_run", None):
+        return loader()
+
+    snapshots = st.session_state.setdefault("_live", {})
+    # Read versions before loading so a change landing mid-load triggers another load
+    versions = feed.versions(topics)
+    cached = snapshots.get(key)
+    if cached and cached[0] == versions:
+        return cached[1]
+    data = loader()
+    snapshots[key] = (versions, data)
+    return data
+
+def get_cached_workspaces(db):
+    """
+    The user's workspaces (_id and name), cached for the session.
+    Revalidated against the user's membership version, a single indexed lookup,
+    so joins and removals made from any session show up on the next rerun.
+    """
+    email = st.session_state.get("user_email")
+    if not email:
+        return []
+    version = db.get_membership_version(email)
+    cached = st.session_state.get("_ws_cache")
+    if cached and cached[0] == email and cached[1] == version:
+        return cached[2]
+    workspaces = db.get_user_workspaces(email)
+    st.session_state._ws_cache = (email, version, workspaces)
+    return workspaces
+
+def _set_timer_state(timer):
+    """Mirror an active_timers document (or None) into the session keys the pages read"""
+    if timer:
+        started = timer["started_at"].replace(tzinfo=datetime.timezone.utc)
+        st.session_state.timer_running = True
+        st.session_state.timer_start = started.timestamp()
+        st.session_state.timer_task_id = timer["task_id"]
+        st.session_state.timer_task_title = timer.get("task_title")
+    else:
+        st.session_state.timer_running = False
+        st.session_state.timer_start = None
+
+def sync_active_timer(db):
+    """
+    Mirror the user's running timer into the session on every rerun (one point read by _id),
+    so a timer started or stopped on another device or tab shows up on the next interaction.
+    """
+    if "user_email" not in st.session_state:
+        return
+    _set_timer_state(db.get_active_timer(st.session_state.user_email))
+
+def start_timer(db, task_id, task_title):
+    """
+    Start a timer on the task. A timer already running elsewhere is stopped and logged first;
+    returns its (task_id, task_title, seconds), and leaves a note in timer_notice for the page.
+    """
+    timer, stopped = db.start_timer(st.session_state.user_email, task_id, task_title)
+    _set_timer_state(timer)
+    if stopped:
+        _, title, seconds = stopped
+        st.session_state.timer_notice = f"Stopped the timer on \"{title or 'another task'}\" and logged {seconds // 60}m."
+    return stopped
+
+def stop_timer(db):
+    """Stop the running timer; the elapsed time is logged as a single entry. Returns (task_id, seconds) or None."""
+    result = db.stop_timer(st.session_state.user_email)
+    _set_timer_state(None)
+    return result
+
+@st.fragment
 def render_sidebar_timer():
-    """Clockify-style Sidebar Timer"""
-    if "timer_start" in st.session_state and st.session_state.timer_running:
-        elapsed = int(time.time() - st.session_state.timer_start)
-        h, r = divmod(elapsed, 3600)
-        m, s = divmod(r, 60)
-        time_str = f"{h:02}:{m:02}:{s:02}"
-        
-        st.sidebar.markdown(f"""
-        <div class="ds-timer-card">
-            <div style="font-size:0.8rem; color:#fff; opacity:0.7;">TRACKING TIME</div>
-            <div class="ds-timer-display">{time_str}</div>
-            <div style="font-size:0.75rem; color:#f6b900;">{st.session_state.get('timer_task_title', 'Unknown Task')}</div>
-        </div>
-        """, unsafe_allow_html=True)
+    """Clockify-style Sidebar Timer (call inside `with st.sidebar:`; fragments can't open the sidebar themselves)"""
+    if st.session_state.get("timer_running") and st.session_state.get("timer_start"):
+        # Ticks in the browser; the server only renders it when the timer starts
+        render_running_timer(st.session_state.timer_start * 1000, st.session_state.get("timer_task_title"))
         
-        if st.sidebar.button("Stop Timer", use_container_width=True):
-            st.session_state.stop_timer_trigger = True
+        if st.button("Stop Timer", key="sidebar_stop_timer", use_container_width=True):
+            stop_timer(DreamShiftDB())
+            # Totals shown on the page changed, so this one reruns everything
             st.rerun()
 
 def hide_streamlit_sidebar():
-    """Hide default Streamlit sidebar nav"""
-    st.markdown("""
-    <style>
-    [data-testid="stSidebarNav"],
-    section[data-testid="stSidebarNav"],
-    div[data-testid="stSidebarNav"],
-    div[data-testid="stSidebarNavItems"],
-    ul[data-testid="stSidebarNavItems"],
-    div[data-testid="stSidebarNavSeparator"],
-    nav[aria-label="Main navigation"],
-    nav[aria-label="Sidebar navigation"],
-    [data-testid="stSidebarNav"] * {display: none !important;}
-    </style>
-    """, unsafe_allow_html=True)
-
-def render_custom_sidebar():
-    """Renders the custom sidebar with specific items and SVGs"""
+    """Hide default Streamlit sidebar nav (the rules live in static/styles.css)"""
+    load_global_css()
+
+def _queue_search():
+    """Sidebar search callback: hand the query to the search page and clear the box"""
+    query = st.session_state.get("sidebar_search", "").strip()
+    st.session_state.sidebar_search = ""
+    if query:
+        st.session_state.search_query = query
+        st.session_state.search_page = 0
+        st.session_state._open_search = True
+
+def render_custom_sidebar(workspaces=None):
+    """Renders the custom sidebar with specific items and SVGs (pass workspaces if the page already loaded them)"""
     load_global_css()
     hide_streamlit_sidebar()
 
     db = DreamShiftDB()
+    # Every app page renders the sidebar; scripts never do, so they never start the feed
+    start_change_feed(db)
     
     with st.sidebar:
         # --- LOGO ---
@@ -81,6 +165,9 @@ def render_custom_sidebar():
         </div>
         """, unsafe_allow_html=True)
 
+        sync_active_timer(db)
+        render_sidebar_timer()
+
         # --- MENU ITEMS ---
         # Using st.page_link with Material icons (SVG path doesn't work directly in st.page_link)
         
@@ -88,7 +175,8 @@ def render_custom_sidebar():
         
         # Workspace Switcher (Inline)
         if "user_email" in st.session_state:
-            workspaces = db.get_user_workspaces(st.session_state.user_email)
+            if workspaces is None:
+                workspaces = get_cached_workspaces(db)
             ws_names = [w['name'] for w in workspaces]
             current_id = st.session_state.get("current_ws_id")
             
@@ -118,11 +206,23 @@ def render_custom_sidebar():
                             st.rerun()
                 st.markdown('<div class="ds-sidebar-sep"></div>', unsafe_allow_html=True)
 
+        # Global search: Enter opens the results page
+        st.text_input(
+            "Search",
+            key="sidebar_search",
+            placeholder="Search tasks, projects, comments…",
+            label_visibility="collapsed",
+            on_change=_queue_search,
+        )
+        if st.session_state.pop("_open_search", False):
+            st.switch_page("pages/search.py")
+
         st.markdown('<div class="ds-sidebar-section-title">Navigation</div>', unsafe_allow_html=True)
         st.page_link("pages/workspaces.py", label="Workspaces", icon="🏢")
         st.page_link("pages/projects.py", label="Projects", icon="📁")
         st.page_link("pages/tasks.py", label="Tasks", icon="✅")
         st.page_link("pages/task-templates.py", label="Templates", icon="🧩")
+        st.page_link("pages/timesheets.py", label="Timesheets", icon="⏱️")
         st.page_link("pages/inbox.py", label="Inbox", icon="🔔")
         st.page_link("pages/profile.py", label="Profile", icon="👤")
         st.page_link("pages/settings.py", label="Settings", icon="⚙️")
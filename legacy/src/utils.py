@@ -1,8 +1,7 @@
 import os
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
 
 def get_google_auth_flow():
+    from google_auth_oauthlib.flow import Flow
     return Flow.from_client_config(
         {"web": {
             "client_id": os.getenv("GOOGLE_CLIENT_ID"),
@@ -13,8 +12,14 @@ def get_google_auth_flow():
         scopes=["https://www.googleapis.com/auth/calendar.events"]
     )
 
-def push_to_calendar(creds, title, date):
-    service = build("calendar", "v3", credentials=creds)
+def push_to_calendar(creds, title, date, db=None, user_email=None):
+    """Adds an all-day event. With db and user_email, reuses that user's cached service."""
+    from googleapiclient.discovery import build
+    from src.calendar_sync import get_calendar_service
+
+    service = get_calendar_service(db, user_email, creds) if db and user_email else None
+    if service is None:
+        service = build("calendar", "v3", credentials=creds, cache_discovery=False, static_discovery=True)
     event = {
         'summary': f'DreamShift: {title}',
         'start': {'date': date.strftime('%Y-%m-%d')},
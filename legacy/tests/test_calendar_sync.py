@@ -0,0 +1,241 @@
+import datetime
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+from bson import ObjectId
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpMockSequence
+
+from src import calendar_sync
+from src.calendar_sync import content_hash, build_event_body, event_id_for_task, plan_gcal_sync
+
+USER = "ann@example.com"
+DUE = datetime.datetime(2024, 3, 15, 17, 0)
+
+class RecordingHttp(HttpMockSequence):
+    """HttpMockSequence that also remembers every request it answered"""
+
+    def __init__(self, iterable):
+        super().__init__(iterable)
+        self.requests = []
+
+    def request(self, uri, method="GET", body=None, headers=None, *args, **kwargs):
+        self.requests.append((method, uri, body))
+        return super().request(uri, method, body, headers, *args, **kwargs)
+
+def batch_response(parts):
+    """multipart/mixed batch reply; parts are (request_id, status, json body)"""
+    boundary = "batch_test"
+    chunks = []
+    for request_id, status, body in parts:
+        payload = json.dumps(body)
+        chunks.append(
+            f"--{boundary}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <response-test + {request_id}>\r\n\r\n"
+            f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n"
+            f"{payload}\r\n"
+        )
+    return ({"status": "200", "content-type": f"multipart/mixed; boundary={boundary}"},
+            "".join(chunks) + f"--{boundary}--")
+
+def error(status):
+    return {"error": {"code": status, "message": "test"}}
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+        self.writes = []
+
+    def find(self, query=None, projection=None):
+        return list(self.docs)
+
+    def find_one(self, query=None, projection=None):
+        return self.docs[0] if self.docs else None
+
+    def update_one(self, query, update, upsert=False):
+        self.writes.append((query, update))
+
+    def bulk_write(self, requests, ordered=True):
+        self.writes.extend((r._filter, r._doc) for r in requests)
+        return SimpleNamespace(modified_count=len(requests))
+
+class FakeDB:
+    ObjectId = ObjectId
+
+    def __init__(self, tasks=(), users=()):
+        self.db = SimpleNamespace(tasks=FakeCollection(tasks), users=FakeCollection(users))
+        self.invalidated = []
+
+    def invalidate_workspace(self, workspace_id):
+        self.invalidated.append(workspace_id)
+
+def use_service(monkeypatch, responses):
+    http = RecordingHttp(responses)
+    service = build("calendar", "v3", http=http, static_discovery=True)
+    monkeypatch.setattr(calendar_sync, "get_calendar_service", lambda db, email, creds=None: service)
+    return http
+
+def task(**fields):
+    doc = {"_id": ObjectId(), "title": "Report", "priority": "High", "assignee": USER,
+           "status": "To Do", "due_date": DUE}
+    doc.update(fields)
+    return doc
+
+# --- plan_gcal_sync ---
+
+def test_plan_inserts_new_and_patches_changed_tasks():
+    new = task()
+    changed = task(gcal_event_id="ev1", gcal_hash="stale", gcal_owner=USER)
+    plan = plan_gcal_sync([new, changed], USER)
+    assert [(a, t["_id"]) for a, t, _ in plan] == [("insert", new["_id"]), ("patch", changed["_id"])]
+
+def test_plan_skips_unchanged_tasks():
+    t = task(gcal_event_id="ev1", gcal_owner=USER)
+    t["gcal_hash"] = content_hash(build_event_body(t))
+    assert plan_gcal_sync([t], USER) == []
+
+def test_plan_deletes_events_no_longer_wanted():
+    done = task(status="Completed", gcal_event_id="ev1", gcal_owner=USER)
+    reassigned = task(assignee="bob@example.com", gcal_event_id="ev2", gcal_owner=USER)
+    undated = task(due_date=None, gcal_event_id="ev3", gcal_owner=USER)
+    plan = plan_gcal_sync([done, reassigned, undated], USER)
+    assert [a for a, _, _ in plan] == ["delete", "delete", "delete"]
+
+def test_plan_leaves_other_owners_and_detached_tasks_alone():
+    elsewhere = task(gcal_event_id="ev1", gcal_owner="bob@example.com", gcal_hash="stale")
+    detached = task(gcal_detached=True)
+    assert plan_gcal_sync([elsewhere, detached], USER) == []
+
+# --- sync_all_tasks_to_gcal ---
+
+def test_sync_records_event_ids_and_hashes(monkeypatch):
+    t = task()
+    db = FakeDB(tasks=[t])
+    use_service(monkeypatch, [batch_response([(str(t["_id"]), 200, {"id": "ds-created"})])])
+
+    assert calendar_sync.sync_all_tasks_to_gcal(db, USER) == 1
+    (query, update), = db.db.tasks.writes
+    assert query == {"_id": t["_id"]}
+    assert update["$set"]["gcal_event_id"] == "ds-created"
+    assert update["$set"]["gcal_hash"] == content_hash(build_event_body(t))
+    assert update["$set"]["gcal_owner"] == USER
+
+def test_sync_retries_conflicting_insert_as_patch(monkeypatch):
+    conflicted, fresh = task(), task(title="Other")
+    cid, fid = str(conflicted["_id"]), str(fresh["_id"])
+    db = FakeDB(tasks=[conflicted, fresh])
+    http = use_service(monkeypatch, [
+        batch_response([(cid, 409, error(409)), (fid, 200, {"id": event_id_for_task(fid)})]),
+        batch_response([(cid, 200, {"id": event_id_for_task(cid)})]),
+    ])
+
+    assert calendar_sync.sync_all_tasks_to_gcal(db, USER) == 2
+    retry_method, _, retry_body = http.requests[1]
+    assert retry_method == "POST"  # the batch envelope
+    assert f"PATCH /calendar/v3/calendars/primary/events/{event_id_for_task(cid)}" in retry_body
+    ids = {q["_id"]: u["$set"]["gcal_event_id"] for q, u in db.db.tasks.writes}
+    assert ids == {conflicted["_id"]: event_id_for_task(cid), fresh["_id"]: event_id_for_task(fid)}
+
+def test_sync_restores_cancelled_event_when_insert_conflicts(monkeypatch):
+    # Reopened task: its fixed event ID still exists on Google's side, cancelled
+    reopened = task()
+    rid = str(reopened["_id"])
+    db = FakeDB(tasks=[reopened])
+    http = use_service(monkeypatch, [
+        batch_response([(rid, 409, error(409))]),
+        batch_response([(rid, 200, {"id": event_id_for_task(rid), "status": "confirmed"})]),
+    ])
+
+    assert calendar_sync.sync_all_tasks_to_gcal(db, USER) == 1
+    _, _, retry_body = http.requests[1]
+    assert f"PATCH /calendar/v3/calendars/primary/events/{event_id_for_task(rid)}" in retry_body
+    assert '"status": "confirmed"' in retry_body
+    (query, update), = db.db.tasks.writes
+    assert update["$set"]["gcal_hash"] == content_hash(build_event_body(reopened))
+    assert update["$set"]["gcal_owner"] == USER
+
+def test_sync_treats_missing_event_as_deleted_and_skips_failures(monkeypatch):
+    gone = task(status="Completed", gcal_event_id="ev1", gcal_owner=USER)
+    failing = task(title="Fails")
+    db = FakeDB(tasks=[gone, failing])
+    use_service(monkeypatch, [batch_response([
+        (str(gone["_id"]), 404, error(404)),
+        (str(failing["_id"]), 500, error(500)),
+    ])])
+
+    assert calendar_sync.sync_all_tasks_to_gcal(db, USER) == 1
+    (query, update), = db.db.tasks.writes
+    assert query == {"_id": gone["_id"]}
+    assert "$unset" in update
+
+# --- pull_gcal_changes ---
+
+def event(task_id, **fields):
+    doc = {"id": f"ds{task_id}", "status": "confirmed",
+           "start": {"dateTime": "2024-03-20T10:00:00Z"},
+           "extendedProperties": {"private": {calendar_sync.TASK_PROPERTY: str(task_id)}}}
+    doc.update(fields)
+    return doc
+
+def page(items, **tokens):
+    return ({"status": "200"}, json.dumps({"items": items, **tokens}))
+
+def test_pull_pages_through_sync_token_and_stores_the_next_one(monkeypatch):
+    moved, deleted = task(workspace_id="ws1"), task()
+    db = FakeDB(tasks=[moved], users=[{"email": USER, "gcal_sync_token": "sync-1"}])
+    http = use_service(monkeypatch, [
+        page([event(moved["_id"])], nextPageToken="page-2"),
+        page([event(deleted["_id"], status="cancelled"), {"id": "not-ours"}], nextSyncToken="sync-2"),
+    ])
+
+    assert calendar_sync.pull_gcal_changes(db, USER) == 2
+    first, second = (uri for _, uri, _ in http.requests)
+    assert "syncToken=sync-1" in first and "pageToken" not in first
+    assert "syncToken=sync-1" in second and "pageToken=page-2" in second
+
+    writes = db.db.tasks.writes
+    assert writes[0] == (
+        {"_id": moved["_id"], "gcal_owner": USER, "due_date": {"$ne": datetime.datetime(2024, 3, 20, 10, 0)}},
+        {"$set": {"due_date": datetime.datetime(2024, 3, 20, 10, 0), "updated_at": writes[0][1]["$set"]["updated_at"]}},
+    )
+    assert writes[1][1]["$set"] == {"gcal_detached": True}
+    # Moved tasks are re-hashed so the next push does not echo the change back
+    assert writes[2][0] == {"_id": moved["_id"]} and "gcal_hash" in writes[2][1]["$set"]
+    assert db.invalidated == ["ws1"]
+    assert db.db.users.writes == [({"email": USER}, {"$set": {"gcal_sync_token": "sync-2"}})]
+
+def test_pull_restarts_full_sync_when_token_expired(monkeypatch):
+    db = FakeDB(users=[{"email": USER, "gcal_sync_token": "expired"}])
+    http = use_service(monkeypatch, [
+        ({"status": "410"}, json.dumps(error(410))),
+        page([], nextSyncToken="fresh"),
+    ])
+
+    assert calendar_sync.pull_gcal_changes(db, USER) == 0
+    assert "syncToken=expired" in http.requests[0][1]
+    assert "syncToken" not in http.requests[1][1]
+    assert db.db.users.writes == [({"email": USER}, {"$set": {"gcal_sync_token": "fresh"}})]
+
+# --- get_calendar_service ---
+
+def test_service_cache_is_keyed_by_user_not_credentials(monkeypatch):
+    from google.oauth2.credentials import Credentials
+
+    built = []
+    monkeypatch.setattr(calendar_sync, "_service_cache", calendar_sync._ServiceCache(4))
+    monkeypatch.setattr(calendar_sync, "_build_service", lambda creds: built.append(creds) or object())
+    expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+    first = calendar_sync.get_calendar_service(None, USER, Credentials(token="t1", expiry=expiry))
+    newer = Credentials(token="t2", expiry=expiry + datetime.timedelta(hours=1))
+    second = calendar_sync.get_calendar_service(None, USER, newer)
+
+    assert second is first and len(built) == 1
+    # The service's credentials picked up the newer token in place
+    assert built[0].token == "t2" and built[0].expiry == newer.expiry
@@ -0,0 +1,84 @@
+import datetime
+
+from components.calendar.calendar_utils import TaskIntervalIndex, task_day_span
+
+D = datetime.date
+
+def task(name, start=None, due=None):
+    t = {"title": name}
+    if start:
+        t["start_date"] = datetime.datetime.combine(start, datetime.time(9))
+    if due:
+        t["due_date"] = datetime.datetime.combine(due, datetime.time(17))
+    return t
+
+def titles(tasks):
+    return sorted(t["title"] for t in tasks)
+
+def test_span_uses_due_date_when_start_missing():
+    assert task_day_span(task("a", due=D(2024, 3, 5))) == (D(2024, 3, 5), D(2024, 3, 5))
+
+def test_span_collapses_start_after_due():
+    assert task_day_span(task("a", start=D(2024, 3, 9), due=D(2024, 3, 5))) == (D(2024, 3, 5), D(2024, 3, 5))
+
+def test_tasks_without_due_date_are_not_indexed():
+    index = TaskIntervalIndex([task("no-dates"), task("start-only", start=D(2024, 3, 1))])
+    assert index.size == 0
+    assert index.overlapping(D(2024, 1, 1), D(2024, 12, 31)) == []
+
+def test_tasks_spanning_the_query_boundaries():
+    index = TaskIntervalIndex([
+        task("covers", start=D(2024, 2, 20), due=D(2024, 4, 10)),
+        task("enters", start=D(2024, 2, 25), due=D(2024, 3, 3)),
+        task("leaves", start=D(2024, 3, 28), due=D(2024, 4, 2)),
+        task("inside", start=D(2024, 3, 10), due=D(2024, 3, 12)),
+        task("before", start=D(2024, 2, 1), due=D(2024, 2, 29)),
+        task("after", start=D(2024, 4, 1), due=D(2024, 4, 5)),
+    ])
+    found = index.overlapping(D(2024, 3, 1), D(2024, 3, 31))
+    assert titles(found) == ["covers", "enters", "inside", "leaves"]
+
+def test_tasks_touching_a_boundary_day_are_included():
+    index = TaskIntervalIndex([
+        task("ends-on-first", start=D(2024, 2, 20), due=D(2024, 3, 1)),
+        task("starts-on-last", start=D(2024, 3, 31), due=D(2024, 4, 3)),
+        task("ends-day-before", start=D(2024, 2, 20), due=D(2024, 2, 29)),
+        task("starts-day-after", start=D(2024, 4, 1), due=D(2024, 4, 3)),
+    ])
+    assert titles(index.overlapping(D(2024, 3, 1), D(2024, 3, 31))) == ["ends-on-first", "starts-on-last"]
+
+def test_single_day_tasks_and_missing_start():
+    index = TaskIntervalIndex([
+        task("due-only", due=D(2024, 3, 15)),
+        task("same-day", start=D(2024, 3, 16), due=D(2024, 3, 16)),
+    ])
+    assert titles(index.on_day(D(2024, 3, 15))) == ["due-only"]
+    assert titles(index.on_day(D(2024, 3, 16))) == ["same-day"]
+    assert index.on_day(D(2024, 3, 14)) == []
+
+def test_each_task_listed_once_ordered_by_end():
+    index = TaskIntervalIndex([
+        task("long", start=D(2024, 3, 1), due=D(2024, 3, 20)),
+        task("short", start=D(2024, 3, 5), due=D(2024, 3, 6)),
+    ])
+    assert [t["title"] for t in index.overlapping(D(2024, 3, 1), D(2024, 3, 31))] == ["short", "long"]
+
+def test_matches_brute_force():
+    base = D(2024, 1, 1)
+    tasks = []
+    for i in range(60):
+        start = base + datetime.timedelta(days=(i * 7) % 50)
+        tasks.append(task(f"t{i}", start=start if i % 4 else None, due=start + datetime.timedelta(days=i % 9)))
+    index = TaskIntervalIndex(tasks)
+    for a in range(0, 60, 5):
+        for length in (0, 1, 6, 30):
+            lo = base + datetime.timedelta(days=a)
+            hi = lo + datetime.timedelta(days=length)
+            expected = [t["title"] for t in tasks if task_day_span(t)[0] <= hi and task_day_span(t)[1] >= lo]
+            assert titles(index.overlapping(lo, hi)) == sorted(expected)
+
+def test_by_day_and_counts():
+    index = TaskIntervalIndex([task("a", start=D(2024, 3, 1), due=D(2024, 3, 2))])
+    days = [D(2024, 3, 1), D(2024, 3, 2), D(2024, 3, 3)]
+    assert list(index.by_day(days)) == days[:2]
+    assert index.counts(days) == {days[0]: 1, days[1]: 1, days[2]: 0}
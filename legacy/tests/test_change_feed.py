@@ -0,0 +1,60 @@
+from src import change_feed
+from src.change_feed import ChangeFeed
+from src.database import _QueryCache
+
+class RecordingDB:
+    def __init__(self):
+        self.calls = []
+
+    def invalidate_workspace(self, workspace_id):
+        self.calls.append(workspace_id)
+
+    def invalidate_all(self):
+        self.calls.append("*")
+
+def change(coll, doc=None, _id=1):
+    return {"ns": {"coll": coll}, "documentKey": {"_id": _id}, "fullDocument": doc}
+
+def test_routes_cached_collections_by_workspace():
+    db = RecordingDB()
+    feed = ChangeFeed(db)
+    feed.handle(change("tasks", {"workspace_id": "w1"}))
+    feed.handle(change("projects", {"workspace_id": "w2"}))
+    feed.handle(change("task_templates", {"workspace_id": "w3"}))
+    # Deletes carry no document
+    feed.handle(change("task_templates", None))
+    assert db.calls == ["w1", "w2", "w3", "*"]
+    assert feed.versions(["tasks:w1", "tasks:w2"]) == (1, 0)
+
+def test_topic_table_is_bounded_and_never_repeats_versions(monkeypatch):
+    monkeypatch.setattr(change_feed, "TOPIC_LIMIT", 2)
+    feed = ChangeFeed(RecordingDB())
+    feed.publish("a")
+    before = feed.versions(["a"])
+    feed.publish("b")
+    feed.publish("c")
+    assert feed.versions(["a"]) == (0,)
+    feed.publish("a")
+    assert feed.versions(["a"]) != before
+
+def test_clear_rejects_reads_started_before_it():
+    cache = _QueryCache(maxsize=8, ttl=60)
+    version = cache.version("w")
+    cache.clear()
+    cache.put("w", "k", "stale", version)
+    assert cache.get("w", "k") == (False, None)
+    cache.put("w", "k", "fresh", cache.version("w"))
+    assert cache.get("w", "k") == (True, "fresh")
+
+def test_feed_restarts_in_a_forked_process(monkeypatch):
+    monkeypatch.setattr(change_feed, "LIVE_UPDATES", True)
+    monkeypatch.setattr(change_feed, "_feed", None)
+    monkeypatch.setattr(ChangeFeed, "start", lambda self: self)
+    monkeypatch.setattr(change_feed.os, "getpid", lambda: 100)
+    parent = change_feed.start_change_feed(RecordingDB())
+    assert change_feed.start_change_feed(RecordingDB()) is parent
+
+    monkeypatch.setattr(change_feed.os, "getpid", lambda: 200)
+    assert change_feed.get_change_feed() is None
+    child = change_feed.start_change_feed(RecordingDB())
+    assert child is not parent and change_feed.get_change_feed() is child
@@ -0,0 +1,36 @@
+import importlib.util
+import os
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "profile_startup.py")
+spec = importlib.util.spec_from_file_location("profile_startup", SCRIPT)
+profile_startup = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(profile_startup)
+
+def app(tmp_path, pages):
+    """Minimal app tree: Home.py plus pages/{name}.py with the given source"""
+    (tmp_path / "pages").mkdir()
+    (tmp_path / "Home.py").write_text("import json\n")
+    for name, source in pages.items():
+        (tmp_path / "pages" / f"{name}.py").write_text(source)
+    return str(tmp_path)
+
+def test_heavy_modules_match_packages_not_namespace_roots():
+    loaded = {"google", "google.protobuf", "googleapiclient.discovery", "plotly"}
+    assert profile_startup.heavy_modules(loaded) == ["googleapiclient", "plotly"]
+
+def test_heavy_modules_ignore_what_the_baseline_already_loads():
+    baseline = {"google", "google.protobuf", "plotly", "plotly.io"}
+    loaded = baseline | {"bcrypt"}
+    assert profile_startup.heavy_modules(loaded, baseline) == ["bcrypt"]
+
+def test_strict_passes_pages_without_heavy_imports(tmp_path, monkeypatch):
+    monkeypatch.setattr(profile_startup, "APP_ROOT", app(tmp_path, {"plain": "import os\nimport streamlit as st\n"}))
+    assert profile_startup.profile_startup(runs=1, strict=True)
+
+def test_strict_fails_a_page_that_imports_a_heavy_dependency(tmp_path, monkeypatch, capsys):
+    pytest.importorskip("bcrypt")
+    monkeypatch.setattr(profile_startup, "APP_ROOT", app(tmp_path, {"login": "import bcrypt\n"}))
+    assert not profile_startup.profile_startup(runs=1, strict=True)
+    assert "pages/login.py: loads bcrypt at import" in capsys.readouterr().out